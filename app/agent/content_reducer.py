@@ -0,0 +1,130 @@
+"""
+Content Reducer - fits long articles/transcripts into the digest prompt's token budget
+
+Purpose:
+    DigestAgent used to send content[:8000]: an hour-long transcript lost everything after
+    its first minutes, and the part that was kept was mostly intro chatter. The reducer keeps
+    the most central sentences of the WHOLE text instead, at the same (or lower) prompt size.
+
+Modes (DIGEST_REDUCE_MODE):
+    - "extractive" (default): local TF-IDF sentence scoring, NumPy only, no network
+        1. split into sentences (unpunctuated transcripts → fixed word windows)
+        2. score(sentence) = cosine similarity to the document's TF-IDF centroid,
+           small bonus for the opening sentences (intros usually state the point)
+        3. take sentences best-first while they fit the budget, skipping near-duplicates
+           of ones already taken, and emit them in their original order
+    - "map_reduce": as extractive, but items longer than DIGEST_MAP_REDUCE_MIN_TOKENS are first
+      summarised chunk by chunk by the LLM (map) and the digest is written from those notes
+      (reduce). Costs one extra LLM call per chunk; see DigestAgent._map_chunks.
+    - "truncate": the old behaviour (first budget × CHARS_PER_TOKEN characters)
+
+Token counts are estimated (~4 characters per token for English text), no tokenizer download.
+
+Usage:
+    content = reduce_content(transcript, token_budget=2000)
+    chunks = split_chunks(transcript, chunk_tokens=2000, max_chunks=6)
+"""
+
+import math
+import re
+from typing import List, Tuple
+import numpy as np
+from app.metrics import METRICS
+from .prefilter import _tokenize, _tfidf_matrix
+
+
+CHARS_PER_TOKEN = 4.0
+MAX_SEGMENT_WORDS = 60        # longer "sentences" (auto transcripts have no punctuation) are cut into windows
+LEAD_SENTENCES = 3
+LEAD_BONUS = 0.1
+REDUNDANCY_THRESHOLD = 0.8    # cosine similarity above which a sentence repeats one already taken
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_sentences(text: str) -> List[str]:
+    segments = []
+    for piece in SENTENCE_SPLIT.split(text):
+        words = piece.split()
+        for start in range(0, len(words), MAX_SEGMENT_WORDS):
+            segments.append(" ".join(words[start:start + MAX_SEGMENT_WORDS]))
+    return segments
+
+
+def score_sentences(sentences: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (scores, normalised TF-IDF rows) for the sentences, in input order."""
+    matrix = _tfidf_matrix([_tokenize(s) for s in sentences])
+    centroid = matrix.sum(axis=0)
+    norm = np.linalg.norm(centroid)
+    scores = matrix @ (centroid / norm) if norm else np.zeros(len(sentences), dtype=np.float32)
+    scores[:LEAD_SENTENCES] *= 1.0 + LEAD_BONUS
+    return scores, matrix
+
+
+def extract_sentences(text: str, token_budget: int) -> str:
+    if estimate_tokens(text) <= token_budget:
+        return text
+    sentences = split_sentences(text)
+    if not sentences:
+        return text[:int(token_budget * CHARS_PER_TOKEN)]
+
+    scores, matrix = score_sentences(sentences)
+    max_similarity = np.zeros(len(sentences), dtype=np.float32)   # to the closest sentence taken so far
+    chosen, repeats = [], []
+    used = 0
+    for i in np.argsort(-scores, kind="stable"):
+        cost = estimate_tokens(sentences[i]) + 1   # + the joining space
+        if used + cost > token_budget:
+            continue
+        if max_similarity[i] > REDUNDANCY_THRESHOLD:
+            repeats.append(i)
+            continue
+        chosen.append(i)
+        used += cost
+        max_similarity = np.maximum(max_similarity, matrix @ matrix[i])
+    # Budget left over (very repetitive text): near-duplicates beat sending less than we could
+    for i in repeats:
+        cost = estimate_tokens(sentences[i]) + 1
+        if used + cost <= token_budget:
+            chosen.append(i)
+            used += cost
+    if not chosen:   # no single segment fits (one huge token: data URI, minified blob): plain cut, never ""
+        return text[:int(token_budget * CHARS_PER_TOKEN)]
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def reduce_content(text: str, token_budget: int, mode: str = "extractive") -> str:
+    if mode == "truncate":
+        return text[:int(token_budget * CHARS_PER_TOKEN)]
+    if estimate_tokens(text) <= token_budget:
+        return text
+    with METRICS.timer("content_reduce") as op:
+        reduced = extract_sentences(text, token_budget)
+        op["chars_in"] = len(text)
+        op["chars_out"] = len(reduced)
+    return reduced
+
+
+def split_chunks(text: str, chunk_tokens: int, max_chunks: int) -> List[str]:
+    """Consecutive sentence runs of up to chunk_tokens each, at most max_chunks of them
+    (longer texts are reduced extractively to max_chunks × chunk_tokens first)."""
+    if estimate_tokens(text) > chunk_tokens * max_chunks:
+        # 10% headroom: packing whole sentences leaves a little unused at the end of each chunk
+        text = reduce_content(text, int(chunk_tokens * max_chunks * 0.9))
+
+    chunks, current, used = [], [], 0
+    for sentence in split_sentences(text):
+        sentence = sentence[:int(chunk_tokens * CHARS_PER_TOKEN)]   # a lone huge segment must not blow a chunk's budget
+        cost = estimate_tokens(sentence) + 1
+        if current and used + cost > chunk_tokens:
+            chunks.append(" ".join(current))
+            current, used = [], 0
+        current.append(sentence)
+        used += cost
+    if current:
+        chunks.append(" ".join(current))
+    return chunks[:max_chunks]
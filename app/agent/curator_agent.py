@@ -1,10 +1,10 @@
-import os
-from typing import List
-from langchain_huggingface import HuggingFaceEndpoint
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from app.config import CURATOR_BATCH_SIZE, CURATOR_MAX_WORKERS, CURATOR_PREFILTER_TOP_K
+from .prefilter import prefilter_digests
+from .llm_backend import LLMBackend, get_llm_backend
 
 load_dotenv()
 
@@ -48,31 +48,45 @@ Output as JSON with "articles" array. Each must have: digest_id, relevance_score
 
 
 class CuratorAgent:   # Thr currator agent needs "USER_PROFILE" as arg.
-    def __init__(self, user_profile: dict):
-        hf_token = os.getenv("HUGGINGFACE_API_TOKEN")
-        if not hf_token:
-            raise ValueError("HUGGINGFACE_API_TOKEN not found in .env file")
-        
+    def __init__(self, user_profile: dict, prefilter_top_k: int = CURATOR_PREFILTER_TOP_K,
+                 backend: Optional[LLMBackend] = None):
         self.user_profile = user_profile
+        self.prefilter_top_k = prefilter_top_k
+        self.prefilter_scores = {}   # {digest_id: local relevance score} from the last rank_digests call, for debugging
         
         # Use larger model for better ranking (70B > 8B for complex reasoning)
-        self.llm = HuggingFaceEndpoint(
-            repo_id="meta-llama/Meta-Llama-3-70B-Instruct",
-            huggingfacehub_api_token=hf_token,
-            temperature=0.3,
-            max_new_tokens=4096,
-        )
-        
-        self.parser = JsonOutputParser(pydantic_object=RankedDigestList)
-        self.prompt = ChatPromptTemplate.from_template(PROMPT)
-        self.chain = self.prompt | self.llm | self.parser
+        self.backend = backend or get_llm_backend("meta-llama/Meta-Llama-3-70B-Instruct", temperature=0.3, max_new_tokens=4096)
+        self.chain = self.backend.build_chain(PROMPT, RankedDigestList)
 
 
     
-    def rank_digests(self, digests: List[dict]) -> List[RankedArticle]:
+    def rank_digests(self, digests: List[dict], batch_size: int = CURATOR_BATCH_SIZE,
+                     max_workers: int = CURATOR_MAX_WORKERS) -> List[RankedArticle]:
+        """
+        Large days are ranked in fixed-size batches (one prompt each, run concurrently),
+        then merged into one global order by relevance_score, so prompt size and output
+        length stay bounded however many digests there are.
+        A failed batch only drops its own digests instead of the whole ranking.
+        Before any of that, a local TF-IDF prefilter keeps only the prefilter_top_k
+        digests closest to the user's interests (scores kept in self.prefilter_scores).
+        """
         if not digests:
             return []
         
+        digests, self.prefilter_scores = prefilter_digests(digests, self.user_profile["interests"], self.prefilter_top_k)
+        
+        batch_size = max(1, batch_size)
+        batches = [digests[i:i + batch_size] for i in range(0, len(digests), batch_size)]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches))), thread_name_prefix="curator") as executor:
+            batch_results = list(executor.map(self._rank_batch, batches))
+        
+        # Global order: score first, the batch's own rank breaks ties; then renumber 1..N.
+        merged = [a for batch in batch_results for a in batch]
+        merged.sort(key=lambda x: (-x.relevance_score, x.rank))
+        return [a.model_copy(update={"rank": idx}) for idx, a in enumerate(merged, 1)]
+
+
+    def _rank_batch(self, digests: List[dict]) -> List[RankedArticle]:
         interests = "\n".join(f"- {i}" for i in self.user_profile["interests"])
         preferences = "\n".join(f"- {k}: {v}" for k, v in self.user_profile["preferences"].items())
         digest_list = "\n\n".join([
@@ -91,9 +105,13 @@ class CuratorAgent:   # Thr currator agent needs "USER_PROFILE" as arg.
                 "digest_list": digest_list
             })
             
-            articles = [RankedArticle(**a) for a in result["articles"]] # RankedDigest object
-            articles.sort(key=lambda x: x.rank)  #rank the articles in the list as per rank
-            return articles   # list of ranked articles
+            batch_ids = {d["id"] for d in digests}
+            articles = {}
+            for a in result["articles"]:
+                article = RankedArticle(**a)   # RankedDigest object
+                if article.digest_id in batch_ids and article.digest_id not in articles:  # drop invented/duplicate IDs
+                    articles[article.digest_id] = article
+            return sorted(articles.values(), key=lambda x: x.rank)  #rank the articles in the list as per rank
             
         except Exception as e:
             print(f"Error ranking digests: {e}")
@@ -1,10 +1,11 @@
-import os
 from typing import Optional
-from langchain_huggingface import HuggingFaceEndpoint
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from app.config import (DIGEST_CONTENT_TOKEN_BUDGET, DIGEST_REDUCE_MODE, DIGEST_MAP_REDUCE_MIN_TOKENS,
+                        DIGEST_MAP_MAX_CHUNKS)
+from .content_reducer import estimate_tokens, reduce_content, split_chunks
+from .llm_cache import LLMResponseCache, LLM_CACHE_PATH
+from .llm_backend import LLMBackend, get_llm_backend
 
 load_dotenv()
 
@@ -32,30 +33,60 @@ Content: {content}"""
 
 
 class DigestAgent:
-    def __init__(self, model_name: str = "meta-llama/Meta-Llama-3-8B-Instruct"):
-        hf_token = os.getenv("HUGGINGFACE_API_TOKEN")
-        if not hf_token:
-            raise ValueError("HUGGINGFACE_API_TOKEN not found in .env file")
+    def __init__(self, model_name: str = "meta-llama/Meta-Llama-3-8B-Instruct", cache: Optional[LLMResponseCache] = None,
+                 backend: Optional[LLMBackend] = None, token_budget: int = DIGEST_CONTENT_TOKEN_BUDGET,
+                 reduce_mode: str = DIGEST_REDUCE_MODE):
+        if reduce_mode not in ("extractive", "map_reduce", "truncate"):
+            raise ValueError(f"Unknown DIGEST_REDUCE_MODE: {reduce_mode!r} (expected 'extractive', 'map_reduce' or 'truncate')")
+        self.model_name = model_name
+        self.generation_params = {"temperature": 0.7, "max_new_tokens": 512}
+        # LLM_BACKEND picks the backend (huggingface, or fake for offline runs)
+        self.backend = backend or get_llm_backend(model_name, **self.generation_params)
         
-        self.llm = HuggingFaceEndpoint(
-            repo_id=model_name,
-            huggingfacehub_api_token=hf_token,
-            temperature=0.7,
-            max_new_tokens=512,
-        )
+        # Responses already paid for are reused on re-runs/retries. Set LLM_CACHE_PATH="" to disable.
+        self.cache = cache if cache is not None else (LLMResponseCache() if LLM_CACHE_PATH else None)
         
-        self.parser = JsonOutputParser(pydantic_object=DigestOutput)
-        self.prompt = ChatPromptTemplate.from_template(PROMPT)
-        self.chain = self.prompt | self.llm | self.parser
+        # Long content is reduced to ~token_budget tokens (content_reducer) instead of cut at 8000 chars
+        self.token_budget = token_budget
+        self.reduce_mode = reduce_mode
+        
+        self.chain = self.backend.build_chain(PROMPT, DigestOutput)
+
+    def _invoke(self, inputs: dict) -> DigestOutput:
+        cache_key = None
+        if self.cache:
+            cache_key = LLMResponseCache.make_key(self.backend.model_id, PROMPT.format(**inputs), self.generation_params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return DigestOutput(**cached)
+        
+        result = self.chain.invoke(inputs)
+        digest = DigestOutput(**result)   # Unpack this "dictionary" into "keyword arguments". | eg: DigestOutput(title="...", summary="...")
+        if self.cache:
+            self.cache.set(cache_key, digest.model_dump())
+        return digest
+
+    #===================================================================================
+    # Map step for very long items: digest each chunk, the final digest is written from these notes.
+    #===================================================================================
+    def _map_chunks(self, title: str, content: str, article_type: str) -> str:
+        chunks = split_chunks(content, self.token_budget, DIGEST_MAP_MAX_CHUNKS)
+        notes = []
+        for i, chunk in enumerate(chunks, 1):
+            part = self._invoke({"title": f"{title} (part {i}/{len(chunks)})", "content": chunk, "article_type": article_type})
+            notes.append(f"{part.title}: {part.summary}")
+        return "\n".join(notes)
 
     def generate_digest(self, title: str, content: str, article_type: str) -> Optional[DigestOutput]:
         try:
-            result = self.chain.invoke({
+            if self.reduce_mode == "map_reduce" and estimate_tokens(content) > DIGEST_MAP_REDUCE_MIN_TOKENS:
+                content = self._map_chunks(title, content, article_type)
+            inputs = {
                 "title": title,
-                "content": content[:8000],
+                "content": reduce_content(content, self.token_budget, self.reduce_mode),
                 "article_type": article_type
-            })
-            return DigestOutput(**result)   # Unpack this "dictionary" into "keyword arguments". | eg: DigestOutput(title="...", summary="...")
+            }
+            return self._invoke(inputs)
     
         except Exception as e:
             print(f"Error generating digest: {e}")
@@ -17,14 +17,11 @@ Usage:
     digest = agent.create_email_digest_response(articles, total, limit=10)
 """
 
-import os
 from datetime import datetime
 from typing import List, Optional
-from langchain_huggingface import HuggingFaceEndpoint
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from .llm_backend import LLMBackend, get_llm_backend
 
 load_dotenv()
 
@@ -96,27 +93,16 @@ class EmailAgent:
         Output: Personalized greeting + preview
         
     """
-    def __init__(self, user_profile: dict):    # getting User_profile, (Q: from where ???)  'uesrprofile' file provides it
-        hf_token = os.getenv("HUGGINGFACE_API_TOKEN")
-        if not hf_token:
-            raise ValueError("HUGGINGFACE_API_TOKEN not found in .env file")
-        
+    def __init__(self, user_profile: dict, backend: Optional[LLMBackend] = None):    # getting User_profile, (Q: from where ???)  'uesrprofile' file provides it
         self.user_profile = user_profile
         
         # Use smaller/faster model for email generation (simpler task)
-        self.llm = HuggingFaceEndpoint(
-            repo_id="meta-llama/Meta-Llama-3-8B-Instruct",
-            huggingfacehub_api_token=hf_token,
-            temperature=0.7,
-            max_new_tokens=512,
-        )
-        
-        self.parser = JsonOutputParser(pydantic_object=EmailIntroduction)
-        self.prompt = ChatPromptTemplate.from_template(PROMPT)
-        self.chain = self.prompt | self.llm | self.parser
+        self.backend = backend or get_llm_backend("meta-llama/Meta-Llama-3-8B-Instruct", temperature=0.7, max_new_tokens=512)
+        self.chain = self.backend.build_chain(PROMPT, EmailIntroduction)
 
     def generate_introduction(self, ranked_articles: List) -> EmailIntroduction:   #getting RankedArticles as input (Q: from where ?)  currator provides it
-       """  Args:
+        """
+        Args:
             ranked_articles: List of article objects (could be RankedArticle or dict)
                             Must have 'title' and 'relevance_score' attributes/keys
         
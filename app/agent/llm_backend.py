@@ -0,0 +1,194 @@
+"""
+LLM Backends - what the agents' chains run on
+
+Purpose:
+    DigestAgent, CuratorAgent and EmailAgent only need "prompt template + inputs → parsed JSON".
+    A backend builds that chain; the agents call chain.invoke(inputs) and validate the dict
+    with their own pydantic schema, whichever backend produced it.
+
+Backends (LLM_BACKEND):
+    - "huggingface" (default): langchain HuggingFaceEndpoint, needs HUGGINGFACE_API_TOKEN
+    - "fake": deterministic local responses, no network, no token. Valid JSON for the
+      digest, curator and email prompts, with injectable latency and failures:
+          FAKE_LLM_LATENCY_MS   base delay per call
+          FAKE_LLM_JITTER_MS    extra 0..jitter ms, derived from the prompt (reproducible)
+          FAKE_LLM_FAILURE_RATE share of calls that raise FakeLLMError (same prompts fail every run)
+
+Usage:
+    backend = get_llm_backend("meta-llama/Meta-Llama-3-8B-Instruct", temperature=0.7, max_new_tokens=512)
+    chain = backend.build_chain(PROMPT, DigestOutput)
+    result = chain.invoke({"title": ..., "content": ..., "article_type": ...})   # dict
+
+    LLM_BACKEND=fake FAKE_LLM_LATENCY_MS=800 python main.py
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Type
+from pydantic import BaseModel
+from app.metrics import METRICS
+
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "huggingface")
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+FAKE_LLM_JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", "0"))
+FAKE_LLM_FAILURE_RATE = float(os.getenv("FAKE_LLM_FAILURE_RATE", "0"))
+
+
+class LLMBackend(ABC):
+    """One model endpoint. model_id names it in cache keys, so backends never share cached answers."""
+
+    model_id: str
+
+    def build_chain(self, template: str, schema: Type[BaseModel]):
+        """Returns an object with invoke(inputs: dict) -> dict (JSON parsed against schema)."""
+        return _TimedChain(self._build_chain(template, schema), template, f"llm_call.{schema.__name__}")
+
+    @abstractmethod
+    def _build_chain(self, template: str, schema: Type[BaseModel]):
+        """The backend's own chain; build_chain wraps it in the metrics timer."""
+
+
+class _TimedChain:
+    """Every LLM call, whatever the backend, shows up in the run metrics (time, prompt/response bytes)."""
+
+    def __init__(self, chain, template: str, metric_name: str):
+        self.chain = chain
+        self.template = template
+        self.metric_name = metric_name
+
+    def invoke(self, inputs: dict) -> dict:
+        with METRICS.timer(self.metric_name) as op:
+            op["prompt_bytes"] = len(self.template.format(**inputs).encode("utf-8"))
+            result = self.chain.invoke(inputs)
+            op["response_bytes"] = len(json.dumps(result).encode("utf-8"))
+        return result
+
+
+#===================================================================================
+# HuggingFace Inference endpoint via langchain (the production backend).
+#===================================================================================
+class HuggingFaceBackend(LLMBackend):
+    def __init__(self, model_name: str, temperature: float, max_new_tokens: int):
+        # langchain is imported here, not at module load, so importing the pipeline stays cheap
+        from langchain_huggingface import HuggingFaceEndpoint
+
+        hf_token = os.getenv("HUGGINGFACE_API_TOKEN")
+        if not hf_token:
+            raise ValueError("HUGGINGFACE_API_TOKEN not found in .env file")
+
+        self.model_id = model_name
+        self.llm = HuggingFaceEndpoint(
+            repo_id=model_name,
+            huggingfacehub_api_token=hf_token,
+            temperature=temperature,
+            max_new_tokens=max_new_tokens,
+        )
+
+    def _build_chain(self, template: str, schema: Type[BaseModel]):
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_core.output_parsers import JsonOutputParser
+
+        return ChatPromptTemplate.from_template(template) | self.llm | JsonOutputParser(pydantic_object=schema)
+
+
+#===================================================================================
+# Fake backend: answers are a pure function of the rendered prompt.
+#===================================================================================
+class FakeLLMError(RuntimeError):
+    pass
+
+
+def _digest_response(inputs: dict, seed: int) -> dict:
+    words = inputs.get("title", "").split()[:10] or ["Untitled"]
+    sentences = re.split(r"(?<=[.!?])\s+", " ".join(inputs.get("content", "").split()))
+    summary = " ".join(s for s in sentences[:2] if s)[:400] or f"An update from {inputs.get('article_type', 'the source')}."
+    return {"title": " ".join(words), "summary": summary}
+
+
+def _curator_response(inputs: dict, seed: int) -> dict:
+    ids = re.findall(r"^ID: (.+)$", inputs.get("digest_list", ""), flags=re.MULTILINE)
+    scores = {i: int(hashlib.sha256(f"{seed}:{i}".encode()).hexdigest()[:8], 16) % 101 / 10 for i in ids}
+    ranked = sorted(ids, key=lambda i: (-scores[i], i))
+    return {"articles": [
+        {"digest_id": i, "relevance_score": scores[i], "rank": rank, "reasoning": "Fake backend score."}
+        for rank, i in enumerate(ranked, 1)
+    ]}
+
+
+def _email_response(inputs: dict, seed: int) -> dict:
+    count = len([l for l in inputs.get("article_summaries", "").splitlines() if l.strip()])
+    return {
+        "greeting": f"Hello, here is your daily digest of AI news for {inputs.get('current_date', 'today')}.",
+        "introduction": f"Today's digest covers {count} articles, starting with the most relevant to your interests.",
+    }
+
+
+# Keyed by the schema each agent parses into (DigestOutput, RankedDigestList, EmailIntroduction).
+FAKE_RESPONDERS: Dict[str, Callable[[dict, int], dict]] = {
+    "DigestOutput": _digest_response,
+    "RankedDigestList": _curator_response,
+    "EmailIntroduction": _email_response,
+}
+
+
+class _FakeChain:
+    def __init__(self, backend: "FakeLLMBackend", template: str, schema: Type[BaseModel]):
+        if schema.__name__ not in FAKE_RESPONDERS:
+            raise ValueError(f"Fake LLM backend has no responder for {schema.__name__}")
+        self.backend = backend
+        self.template = template
+        self.responder = FAKE_RESPONDERS[schema.__name__]
+
+    def invoke(self, inputs: dict) -> dict:
+        digest = hashlib.sha256(self.template.format(**inputs).encode("utf-8")).digest()
+        seed = int.from_bytes(digest[:8], "big")
+        fraction = int.from_bytes(digest[8:12], "big") / 2**32   # uniform in [0, 1), fixed per prompt
+
+        delay_ms = self.backend.latency_ms + self.backend.jitter_ms * fraction
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        failed = fraction < self.backend.failure_rate
+        self.backend.record(failed)
+        if failed:
+            raise FakeLLMError("Injected fake LLM failure")
+        # Round-trip through JSON text, like a real completion going through the parser
+        return json.loads(json.dumps(self.responder(inputs, seed)))
+
+
+class FakeLLMBackend(LLMBackend):
+    def __init__(self, model_name: str = "fake", latency_ms: float = FAKE_LLM_LATENCY_MS,
+                 jitter_ms: float = FAKE_LLM_JITTER_MS, failure_rate: float = FAKE_LLM_FAILURE_RATE):
+        self.model_id = f"fake:{model_name}"
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    def _build_chain(self, template: str, schema: Type[BaseModel]):
+        return _FakeChain(self, template, schema)
+
+    def record(self, failed: bool) -> None:
+        with self.lock:
+            self.calls += 1
+            self.failures += int(failed)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"calls": self.calls, "failures": self.failures}
+
+
+def get_llm_backend(model_name: str, temperature: float, max_new_tokens: int) -> LLMBackend:
+    if LLM_BACKEND == "fake":
+        return FakeLLMBackend(model_name)
+    if LLM_BACKEND == "huggingface":
+        return HuggingFaceBackend(model_name, temperature, max_new_tokens)
+    raise ValueError(f"Unknown LLM_BACKEND: {LLM_BACKEND!r} (expected 'huggingface' or 'fake')")
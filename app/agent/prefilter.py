@@ -0,0 +1,79 @@
+"""
+Relevance Prefilter - cheap local scoring before the 70B curator
+
+Purpose:
+    Most of a day's digests are obviously off-topic for the user. Scoring them
+    locally (TF-IDF cosine similarity against USER_PROFILE["interests"], NumPy only,
+    no network) lets CuratorAgent send just the top-K candidates to the LLM.
+
+Scoring:
+    - One TF-IDF vector per digest (title + summary) and per interest
+    - score(digest) = best cosine similarity against any single interest
+      (an article deep in one interest should beat one vaguely near all of them)
+
+Usage:
+    scores = score_digests(digests, USER_PROFILE["interests"])
+    top, scores = prefilter_digests(digests, USER_PROFILE["interests"], top_k=50)
+"""
+
+import re
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "their", "this", "to", "was", "we", "with", "how",
+    "new", "our", "you", "your", "can", "will", "into", "about", "more", "than",
+}
+
+
+def _tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def _tfidf_matrix(docs: List[List[str]]) -> np.ndarray:
+    vocab = {}
+    for tokens in docs:
+        for t in tokens:
+            vocab.setdefault(t, len(vocab))
+
+    counts = np.zeros((len(docs), max(len(vocab), 1)), dtype=np.float32)
+    for row, tokens in enumerate(docs):
+        if tokens:
+            np.add.at(counts[row], [vocab[t] for t in tokens], 1.0)
+
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log((1.0 + len(docs)) / (1.0 + df)) + 1.0   # smoothed idf, same as scikit-learn's default
+    matrix = np.log1p(counts) * idf                     # sublinear tf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def score_digests(digests: List[dict], interests: List[str]) -> np.ndarray:
+    """Returns one score in [0, 1] per digest, in input order."""
+    if not digests or not interests:
+        return np.zeros(len(digests), dtype=np.float32)
+
+    docs = [_tokenize(f"{d.get('title', '')} {d.get('summary', '')}") for d in digests]
+    docs += [_tokenize(i) for i in interests]
+    matrix = _tfidf_matrix(docs)   # interests share the vocabulary/idf with the digests
+
+    digest_vectors = matrix[:len(digests)]
+    interest_vectors = matrix[len(digests):]
+    return (digest_vectors @ interest_vectors.T).max(axis=1)
+
+
+def prefilter_digests(digests: List[dict], interests: List[str], top_k: int) -> Tuple[List[dict], Dict[str, float]]:
+    """
+    Returns:
+        (top_k digests by score in original order, {digest_id: score} for every digest)
+    """
+    scores = score_digests(digests, interests)
+    score_by_id = {d["id"]: float(s) for d, s in zip(digests, scores)}
+    if top_k <= 0 or len(digests) <= top_k:
+        return list(digests), score_by_id
+
+    keep = np.argsort(-scores, kind="stable")[:top_k]
+    return [digests[i] for i in sorted(keep)], score_by_id
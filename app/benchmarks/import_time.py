@@ -0,0 +1,85 @@
+"""
+Startup Import-Time Benchmark
+
+Purpose:
+    Guards against import-time regressions. Runs `python -X importtime -c "import <module>"`
+    in a fresh interpreter for each entry point and fails if:
+        - a heavy dependency (docling, langchain, torch, ...) is imported eagerly
+        - the cumulative import time exceeds the budget
+
+Usage:
+    python -m app.benchmarks.import_time
+    python -m app.benchmarks.import_time --budget-ms 800 app.runner
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).parent.parent.parent
+
+ENTRY_POINTS = ["app.runner", "app.daily_runner"]
+
+# Only allowed to load when they are actually used (converting a page, building an agent).
+HEAVY_MODULES = ["docling", "langchain", "langchain_core", "langchain_huggingface", "torch", "transformers"]
+
+DEFAULT_BUDGET_MS = 1500.0
+
+
+def measure_import(module: str) -> Dict[str, int]:
+    """
+    Returns:
+        {imported module name: cumulative import time in microseconds}
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def check(module: str, budget_ms: float) -> List[str]:
+    timings = measure_import(module)
+    total_ms = timings.get(module, 0) / 1000
+    heavy = sorted(name for name in timings if name.split(".")[0] in HEAVY_MODULES)
+
+    print(f"{module}: {total_ms:.0f} ms cumulative, {len(timings)} modules")
+    problems = []
+    if heavy:
+        problems.append(f"{module} eagerly imports heavy modules: {', '.join(heavy[:10])}")
+    if total_ms > budget_ms:
+        problems.append(f"{module} took {total_ms:.0f} ms to import (budget {budget_ms:.0f} ms)")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    problems = []
+    for module in args.modules:
+        problems.extend(check(module, args.budget_ms))
+
+    for problem in problems:
+        print(f"✗ {problem}")
+    if not problems:
+        print("✓ Import time within budget, no heavy eager imports")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
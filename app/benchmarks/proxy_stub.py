@@ -0,0 +1,111 @@
+"""
+Proxy Pool Check against local stub proxies
+
+Purpose:
+    Exercises ProxyPool + YouTubeScraper.get_transcript + _fetch_transcript without YouTube
+    or real proxies. Every proxy is a local endpoint:
+        - dead:    a port nobody listens on (connection refused)
+        - refuse:  a stub proxy that answers every CONNECT with 502 Bad Gateway
+        - healthy: a slot whose transcript client is a local stub (no network at all)
+    and checks that:
+        - proxy failures are retried on other slots, never reported as "no transcript"
+        - failing proxies get benched, the healthy one serves the requests
+        - with only broken proxies the video ends "failed" (row stays NULL), not unavailable
+        - a real "no transcript" answer still ends ("ok", None)
+
+Usage:
+    python -m app.benchmarks.proxy_stub
+"""
+
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from youtube_transcript_api._errors import NoTranscriptFound
+from app.scrapers.proxy_pool import ProxyPool, parse_proxy_line
+from app.scrapers.rate_limit import TokenBucket
+from app.scrapers.youtube import YouTubeScraper
+from app.services.process_youtube import _fetch_transcript
+
+
+class _RefusingProxy(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.request.recv(65536)   # "CONNECT www.youtube.com:443 HTTP/1.1 ..."
+        self.request.sendall(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _StubTranscriptApi:
+    """Stands in for the transcript client behind a working proxy."""
+
+    def __init__(self, missing: set):
+        self.missing = missing
+
+    def fetch(self, video_id: str):
+        if video_id in self.missing:
+            raise NoTranscriptFound(video_id, ["en"], None)
+        return SimpleNamespace(snippets=[SimpleNamespace(text=f"transcript of {video_id}")])
+
+
+def _pool(proxy_urls: List[str], healthy: bool) -> ProxyPool:
+    pool = ProxyPool([parse_proxy_line(url) for url in proxy_urls] + ([("stub-healthy", None)] if healthy else []),
+                     bench_after=2, bench_seconds=300)
+    if healthy:
+        pool.slots[-1].api = _StubTranscriptApi(missing={"no_captions"})
+    return pool
+
+
+def main() -> int:
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _RefusingProxy)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    broken = [f"http://127.0.0.1:{_free_port()}", f"http://127.0.0.1:{server.server_address[1]}"]
+    bucket = TokenBucket(rate=1000.0, capacity=1000)
+    problems = []
+
+    # 1. broken proxies + one healthy: every video succeeds, broken ones end up benched
+    scraper = YouTubeScraper(proxy_pool=_pool(broken, healthy=True))
+    results = {v: _fetch_transcript(scraper, bucket, v, max_retries=3) for v in [f"video{i}" for i in range(10)]}
+    not_ok = {v: r for v, r in results.items() if r[0] != "ok" or r[1] is None}
+    if not_ok:
+        problems.append(f"videos lost behind broken proxies: {not_ok}")
+    stats = {s["proxy"]: s for s in scraper.proxy_pool.stats()}
+    print(f"mixed pool: {stats}")
+    if stats["stub-healthy"]["successes"] != 10:
+        problems.append(f"healthy proxy served {stats['stub-healthy']['successes']}/10")
+    if not all(stats[name]["benched"] for name in stats if name != "stub-healthy"):
+        problems.append("failing proxies were not benched")
+
+    # 2. a real "no transcript" answer is still final
+    status, transcript = _fetch_transcript(scraper, bucket, "no_captions", max_retries=3)
+    if (status, transcript) != ("ok", None):
+        problems.append(f"no-transcript video returned {(status, transcript)}")
+
+    # 3. only broken proxies: "failed" (left NULL, retried next run), never unavailable
+    scraper = YouTubeScraper(proxy_pool=_pool(broken, healthy=False))
+    status, transcript = _fetch_transcript(scraper, bucket, "video_x", max_retries=2)
+    print(f"broken pool: {status} {scraper.proxy_pool.stats()}")
+    if status != "failed":
+        problems.append(f"all-broken pool returned {status!r}, expected 'failed'")
+
+    server.shutdown()
+    for problem in problems:
+        print(f"✗ {problem}")
+    if not problems:
+        print("✓ Proxy failures are retried on other proxies and never mark a video unavailable")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
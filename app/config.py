@@ -1,5 +1,66 @@
+import os
+
 YOUTUBE_CHANNELS = [
     # "UCn8ujwUInbJkBhffxqAPBVQ", # Dave Ebbelaar
     "UCawZsQWqfGSbCI5yjkdVkTA", # Matthew Berman
 ]
 
+# Feed downloads in run_scrapers: total worker threads, and how many of them may hit the same host at once.
+SCRAPER_MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", "16"))
+SCRAPER_PER_HOST_LIMIT = int(os.getenv("SCRAPER_PER_HOST_LIMIT", "4"))
+
+# LLM calls in flight at once in process_digests (1 = sequential).
+DIGEST_MAX_WORKERS = int(os.getenv("DIGEST_MAX_WORKERS", "4"))
+
+# CuratorAgent.rank_digests scores digests in batches of this size, several batches at once.
+CURATOR_BATCH_SIZE = int(os.getenv("CURATOR_BATCH_SIZE", "20"))
+CURATOR_MAX_WORKERS = int(os.getenv("CURATOR_MAX_WORKERS", "4"))
+
+# Only the top-K digests by local TF-IDF relevance reach the curator LLM (0 = send everything).
+CURATOR_PREFILTER_TOP_K = int(os.getenv("CURATOR_PREFILTER_TOP_K", "60"))
+
+# DigestAgent: long content is cut down to about this many tokens before the LLM call.
+# "extractive" keeps the most central sentences (local TF-IDF), "map_reduce" also summarises items over
+# DIGEST_MAP_REDUCE_MIN_TOKENS chunk by chunk first (≤ DIGEST_MAP_MAX_CHUNKS extra LLM calls), "truncate" = old content[:8000].
+DIGEST_CONTENT_TOKEN_BUDGET = int(os.getenv("DIGEST_CONTENT_TOKEN_BUDGET", "2000"))
+DIGEST_REDUCE_MODE = os.getenv("DIGEST_REDUCE_MODE", "extractive")
+DIGEST_MAP_REDUCE_MIN_TOKENS = int(os.getenv("DIGEST_MAP_REDUCE_MIN_TOKENS", "12000"))
+DIGEST_MAP_MAX_CHUNKS = int(os.getenv("DIGEST_MAP_MAX_CHUNKS", "6"))
+
+# Docling conversions in parallel processes in process_anthropic_markdown (1 = in-process, sequential).
+MARKDOWN_MAX_WORKERS = int(os.getenv("MARKDOWN_MAX_WORKERS", str(os.cpu_count() or 1)))
+
+# Transcript fetching in process_youtube_transcripts: worker threads, shared rate limit, retries when throttled.
+TRANSCRIPT_MAX_WORKERS = int(os.getenv("TRANSCRIPT_MAX_WORKERS", "4"))
+TRANSCRIPT_RATE_PER_SEC = float(os.getenv("TRANSCRIPT_RATE_PER_SEC", "2.0"))
+TRANSCRIPT_BURST = int(os.getenv("TRANSCRIPT_BURST", "4"))
+TRANSCRIPT_MAX_RETRIES = int(os.getenv("TRANSCRIPT_MAX_RETRIES", "4"))
+
+# Digest work queue (process_digest_queue): jobs claimed per round, lease length, attempts before "failed".
+DIGEST_QUEUE_BATCH_SIZE = int(os.getenv("DIGEST_QUEUE_BATCH_SIZE", "10"))
+DIGEST_QUEUE_LEASE_SECONDS = int(os.getenv("DIGEST_QUEUE_LEASE_SECONDS", "600"))
+DIGEST_QUEUE_MAX_ATTEMPTS = int(os.getenv("DIGEST_QUEUE_MAX_ATTEMPTS", "3"))
+
+# Enrichment services buffer finished transcripts/markdown and write them in one batch every N items.
+ENRICHMENT_COMMIT_INTERVAL = int(os.getenv("ENRICHMENT_COMMIT_INTERVAL", "25"))
+
+# run_daily_pipeline writes its results + per-stage/per-call metrics here ("" = off). The Prometheus
+# textfile is optional, e.g. point it into node_exporter's --collector.textfile.directory.
+RUN_REPORT_PATH = os.getenv("RUN_REPORT_PATH", "run_report.json")
+PROMETHEUS_TEXTFILE_PATH = os.getenv("PROMETHEUS_TEXTFILE_PATH", "")
+
+# run_daily_pipeline runs its stage graph on this many threads (1 = one stage at a time, in order).
+PIPELINE_STAGE_WORKERS = int(os.getenv("PIPELINE_STAGE_WORKERS", "4"))
+
+# run_daily_pipeline: "dag" runs each stage over the whole batch; "stream" pushes new items through
+# bounded queues (scrape → enrich → digest → save) first, then runs the batch stages for leftovers.
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "dag")
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "32"))
+
+# Daemon mode (python main.py --daemon): daily email time (local HH:MM), per-feed poll interval bounds,
+# polls per typical gap between a feed's posts, and the look-back window passed to the scrapers.
+DAEMON_EMAIL_AT = os.getenv("DAEMON_EMAIL_AT", "07:00")
+DAEMON_MIN_POLL_SECONDS = float(os.getenv("DAEMON_MIN_POLL_SECONDS", "300"))
+DAEMON_MAX_POLL_SECONDS = float(os.getenv("DAEMON_MAX_POLL_SECONDS", str(6 * 3600)))
+DAEMON_POLLS_PER_ITEM = float(os.getenv("DAEMON_POLLS_PER_ITEM", "4"))
+DAEMON_LOOKBACK_HOURS = int(os.getenv("DAEMON_LOOKBACK_HOURS", "24"))
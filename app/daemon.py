@@ -0,0 +1,249 @@
+"""
+Daemon Mode - one resident process instead of a daily cron run
+
+Purpose:
+    run_daily_pipeline pays for imports, the DocumentConverter, the LLM clients and a fresh
+    DB pool on every run, and digests a whole day at once. The daemon builds all of that
+    once and keeps it warm:
+        - one StreamingPipeline (transcript/Docling/DigestAgent workers + DB writer) for its whole life
+        - each feed is polled on its own adaptive schedule; new items go straight into the pipeline
+        - the daily email runs on its own clock (DAEMON_EMAIL_AT, local time)
+
+Adaptive polling (per feed):
+    interval = median gap between the feed's recent publish times / DAEMON_POLLS_PER_ITEM,
+    (remembered in the feed state: with watermarks a poll only returns the new items)
+    clamped to [DAEMON_MIN_POLL_SECONDS, DAEMON_MAX_POLL_SECONDS]. A feed with fewer than
+    two recent entries, or whose fetch fails, backs off (interval × 2).
+    A channel posting daily is polled every few hours; a quiet blog drifts to the max.
+
+Daily email:
+    1. sweep leftovers the stream could not finish (throttled transcripts, failed digests);
+       each sweep is independent, a failing one never stops the email
+    2. rank + send with the warm curator/email agents
+    3. write the run report / Prometheus textfile, then start a fresh metrics window
+
+Usage:
+    python main.py --daemon
+    SIGTERM / Ctrl+C → finishes in-flight items, saves feed state, exits
+"""
+
+import logging
+import signal
+import statistics
+import threading
+import time
+from concurrent.futures import as_completed
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from .config import (DAEMON_EMAIL_AT, DAEMON_MIN_POLL_SECONDS, DAEMON_MAX_POLL_SECONDS, DAEMON_POLLS_PER_ITEM,
+                     DAEMON_LOOKBACK_HOURS, SCRAPER_MAX_WORKERS, SCRAPER_PER_HOST_LIMIT, STREAM_QUEUE_SIZE,
+                     TRANSCRIPT_MAX_WORKERS, TRANSCRIPT_RATE_PER_SEC, TRANSCRIPT_BURST, TRANSCRIPT_MAX_RETRIES,
+                     MARKDOWN_MAX_WORKERS, DIGEST_MAX_WORKERS, ENRICHMENT_COMMIT_INTERVAL,
+                     RUN_REPORT_PATH, PROMETHEUS_TEXTFILE_PATH)
+from .runner import _FeedFetcher
+from .stream_runner import StreamingPipeline, feed_sources, make_markdown_executor
+from .scrapers.youtube import YouTubeScraper
+from .scrapers.openai import OpenAIScraper
+from .scrapers.anthropic import AnthropicScraper
+from .scrapers.feed_state import FeedStateStore
+from .database.repository import Repository
+from .database.connection import get_pool_metrics
+from .metrics import METRICS, write_run_report, write_prometheus_textfile
+from .agent.digest_agent import DigestAgent
+from .agent.curator_agent import CuratorAgent
+from .agent.email_agent import EmailAgent
+from .profiles.user_profile import USER_PROFILE
+from .services.process_youtube import process_youtube_transcripts
+from .services.process_anthropic import process_anthropic_markdown
+from .services.process_digest import process_digests
+from .services.process_email import send_digest_email
+
+logger = logging.getLogger(__name__)
+
+
+class FeedSchedule:
+    def __init__(self, source: str, channel_id: Optional[str], url: str, fetch: Callable[[int], list],
+                 min_interval: float, max_interval: float, polls_per_item: float):
+        self.source = source
+        self.channel_id = channel_id
+        self.url = url
+        self.fetch = fetch
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.polls_per_item = polls_per_item
+        self.interval = min_interval
+        self.next_poll = 0.0   # time.monotonic() value; 0 → due right away
+        self.polls = 0
+
+    @property
+    def name(self) -> str:
+        # feeds without a channel (OpenAI, the three Anthropic feeds) are told apart by their file name
+        return f"{self.source}:{self.channel_id or self.url.rstrip('/').rsplit('/', 1)[-1]}"
+
+    def _schedule(self, interval: float, now: float) -> None:
+        self.interval = min(self.max_interval, max(self.min_interval, interval))
+        self.next_poll = now + self.interval
+
+    def observe(self, published: list, now: float) -> None:
+        self.polls += 1
+        published = sorted(published)
+        if len(published) < 2:
+            self._schedule(self.interval * 2, now)   # too quiet to measure: back off
+            return
+        gaps = [(b - a).total_seconds() for a, b in zip(published, published[1:])]
+        self._schedule(statistics.median(gaps) / self.polls_per_item, now)
+
+    def failed(self, now: float) -> None:
+        self._schedule(self.interval * 2, now)
+
+    def info(self) -> dict:
+        return {"feed": self.name, "interval_seconds": self.interval, "polls": self.polls}
+
+
+def next_email_time(now: datetime, at: str) -> datetime:
+    """Next local datetime at HH:MM, strictly after now."""
+    hour, minute = (int(part) for part in at.split(":"))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return candidate if candidate > now else candidate + timedelta(days=1)
+
+
+class NewsDaemon:
+    def __init__(self, hours: int = DAEMON_LOOKBACK_HOURS, top_n: int = 10, email_at: str = DAEMON_EMAIL_AT,
+                 min_interval: float = DAEMON_MIN_POLL_SECONDS, max_interval: float = DAEMON_MAX_POLL_SECONDS,
+                 polls_per_item: float = DAEMON_POLLS_PER_ITEM):
+        self.hours = hours
+        self.top_n = top_n
+        self.email_at = email_at
+        self.stop_event = threading.Event()
+
+        # Everything expensive is built once, here.
+        self.feed_state = FeedStateStore()
+        self.youtube_scraper = YouTubeScraper(feed_state=self.feed_state)
+        self.digest_agent = DigestAgent()
+        self.curator = CuratorAgent(USER_PROFILE)
+        self.email_agent = EmailAgent(USER_PROFILE)
+        self.repo = Repository()
+        self.executor = make_markdown_executor(MARKDOWN_MAX_WORKERS)
+        self.fetcher = _FeedFetcher(max_workers=SCRAPER_MAX_WORKERS, per_host_limit=SCRAPER_PER_HOST_LIMIT)
+        self.pipeline = StreamingPipeline(STREAM_QUEUE_SIZE, TRANSCRIPT_MAX_WORKERS, MARKDOWN_MAX_WORKERS,
+                                          DIGEST_MAX_WORKERS, TRANSCRIPT_RATE_PER_SEC, TRANSCRIPT_BURST,
+                                          TRANSCRIPT_MAX_RETRIES, ENRICHMENT_COMMIT_INTERVAL)
+        self.schedules = [
+            FeedSchedule(source, channel_id, url, fetch, min_interval, max_interval, polls_per_item)
+            for source, channel_id, url, fetch in feed_sources(
+                self.youtube_scraper, OpenAIScraper(feed_state=self.feed_state), AnthropicScraper(feed_state=self.feed_state))
+        ]
+        self.next_email = next_email_time(datetime.now(), email_at)
+
+    def stop(self, *_) -> None:
+        logger.info("Stopping daemon (finishing in-flight items)...")
+        self.stop_event.set()
+
+    #===================================================================================
+    # Main loop: poll whatever is due, send the email when it's time, sleep until the next deadline.
+    #===================================================================================
+    def run(self) -> None:
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        logger.info(f"Daemon started: {len(self.schedules)} feeds, next email at {self.next_email:%Y-%m-%d %H:%M}")
+        self.pipeline.start(self.youtube_scraper, self.digest_agent, self.executor)
+        try:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                due = [s for s in self.schedules if s.next_poll <= now]
+                if due:
+                    self.poll(due)
+                if datetime.now() >= self.next_email:
+                    self.send_daily_email()
+                    self.next_email = next_email_time(datetime.now(), self.email_at)
+
+                until_poll = min(s.next_poll for s in self.schedules) - time.monotonic()
+                until_email = (self.next_email - datetime.now()).total_seconds()
+                self.stop_event.wait(max(1.0, min(until_poll, until_email)))
+        finally:
+            self.pipeline.stop()
+            self.fetcher.executor.shutdown(wait=True)
+            if self.executor:
+                self.executor.shutdown(wait=True, cancel_futures=True)
+            self.feed_state.save()
+            logger.info(f"Daemon stopped: {self.pipeline.stats()}")
+
+    def poll(self, due: List[FeedSchedule]) -> None:
+        futures = {self.fetcher.submit(s.url, s.fetch, hours=self.hours): s for s in due}
+        for future in as_completed(futures):
+            schedule = futures[future]
+            try:
+                items = future.result()
+            except Exception as e:
+                self.feed_state.discard(schedule.url)
+                schedule.failed(time.monotonic())
+                logger.error(f"Error polling {schedule.name}: {e} (next in {schedule.interval:.0f}s)")
+                continue
+            try:
+                self.pipeline.route(self.repo, schedule.source, schedule.channel_id, items)
+                self.feed_state.commit(schedule.url)   # rows are committed: now the feed may 304 / stop at its watermark
+            except Exception as e:
+                self.repo.session.rollback()
+                self.feed_state.discard(schedule.url)   # next poll refetches and rescans these entries
+                logger.error(f"Error saving {schedule.name}: {e}")
+            published = self.feed_state.recent_published(schedule.url) or [item.published_at for item in items]
+            schedule.observe(published, time.monotonic())
+            logger.info(f"Polled {schedule.name}: {len(items)} entries, next in {schedule.interval:.0f}s")
+        # Only feeds whose rows were saved were committed above
+        self.feed_state.save()
+
+    def send_daily_email(self) -> dict:
+        started = datetime.now()
+        results = {"start_time": started.isoformat(), "mode": "daemon", "sweep": {}, "email": {}, "success": False}
+        # Leftovers only; anything new already went through the stream. Each sweep on its own:
+        # a failed sweep leaves its items for tomorrow, it must not cost today's email.
+        sweeps = [
+            ("youtube", lambda: process_youtube_transcripts(scraper=self.youtube_scraper)),
+            ("anthropic", lambda: process_anthropic_markdown(executor=self.executor)),
+            ("digests", lambda: process_digests(agent=self.digest_agent)),
+        ]
+        with METRICS.stage("sweep"):
+            for name, sweep in sweeps:
+                try:
+                    results["sweep"][name] = sweep()
+                except Exception as e:
+                    logger.error(f"Sweep {name} failed: {e}", exc_info=True)
+                    results["sweep"][name] = {"error": str(e)}
+        try:
+            with METRICS.stage("email"):
+                results["email"] = send_digest_email(hours=24, top_n=self.top_n,
+                                                     curator=self.curator, email_agent=self.email_agent)
+            results["success"] = results["email"].get("success", False)
+        except Exception as e:
+            logger.error(f"Daily email failed: {e}", exc_info=True)
+            results["error"] = str(e)
+
+        results["end_time"] = datetime.now().isoformat()
+        results["duration_seconds"] = (datetime.now() - started).total_seconds()
+        results["stream_since_start"] = self.pipeline.stats()
+        results["feeds"] = [s.info() for s in self.schedules]
+        results["db_pool"] = get_pool_metrics()
+        results["metrics"] = METRICS.snapshot()
+        logger.info(f"Daily email {'sent' if results['success'] else 'failed'}; feeds: {results['feeds']}")
+        try:
+            if RUN_REPORT_PATH:
+                write_run_report(results, RUN_REPORT_PATH)
+            if PROMETHEUS_TEXTFILE_PATH:
+                write_prometheus_textfile(PROMETHEUS_TEXTFILE_PATH, results)
+        except OSError as e:
+            logger.error(f"Could not write run report: {e}")
+        METRICS.reset()   # one metrics window per day
+        return results
+
+
+def run_daemon(**kwargs) -> None:
+    NewsDaemon(**kwargs).run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S')
+    run_daemon()
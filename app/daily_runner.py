@@ -1,14 +1,20 @@
 import logging
 from datetime import datetime
+from typing import List
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from app.runner import run_scrapers
+from app.stream_runner import run_streaming_pipeline
 from app.services.process_anthropic import process_anthropic_markdown
 from app.services.process_youtube import process_youtube_transcripts
 from app.services.process_digest import process_digests
 from app.services.process_email import send_digest_email
+from app.database.connection import get_pool_metrics
+from app.metrics import METRICS, write_run_report, write_prometheus_textfile
+from app.config import RUN_REPORT_PATH, PROMETHEUS_TEXTFILE_PATH, PIPELINE_STAGE_WORKERS, PIPELINE_MODE
+from app.dag import Stage, run_dag
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,7 +24,88 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def run_daily_pipeline(hours: int = 24, top_n: int = 10) -> dict:
+#===================================================================================
+# Stages. Each fills its own part of `results`; dependencies are declared in pipeline_stages().
+#===================================================================================
+def _scrape(results: dict, hours: int) -> None:
+    scraping_results = run_scrapers(hours=hours)
+    results["scraping"] = {
+        "youtube": len(scraping_results.get("youtube", [])),
+        "openai": len(scraping_results.get("openai", [])),
+        "anthropic": len(scraping_results.get("anthropic", [])),
+        "feed_cache": scraping_results.get("feed_cache", {})
+    }
+    logger.info(f"✓ Scraped {results['scraping']['youtube']} YouTube videos, "
+                f"{results['scraping']['openai']} OpenAI articles, "
+                f"{results['scraping']['anthropic']} Anthropic articles "
+                f"(feed cache: {results['scraping']['feed_cache']})")
+
+
+def _stream(results: dict, hours: int) -> None:
+    stream_result = run_streaming_pipeline(hours=hours)
+    results["stream"] = stream_result
+    results["scraping"] = {**stream_result["scraped"], "feed_cache": stream_result["feed_cache"]}
+    first = stream_result["first_digest_seconds"]
+    logger.info(f"✓ Streamed {sum(stream_result['new'].values())} new items: "
+                f"{stream_result['digests']['processed']} digests "
+                f"(first after {f'{first:.1f}s' if first is not None else '-'}, "
+                f"max queue depth {stream_result['max_queue_depth']})")
+
+
+def _anthropic_markdown(results: dict) -> None:
+    anthropic_result = process_anthropic_markdown()
+    results["processing"]["anthropic"] = anthropic_result
+    logger.info(f"✓ Processed {anthropic_result['processed']} Anthropic articles "
+                f"({anthropic_result['failed']} failed)")
+
+
+def _youtube_transcripts(results: dict) -> None:
+    youtube_result = process_youtube_transcripts()
+    results["processing"]["youtube"] = youtube_result
+    logger.info(f"✓ Processed {youtube_result['processed']} transcripts "
+                f"({youtube_result['unavailable']} unavailable, {youtube_result['failed']} failed, retried next run)")
+
+
+def _digests(results: dict) -> None:
+    digest_result = process_digests()
+    results["digests"] = digest_result
+    logger.info(f"✓ Created {digest_result['processed']} digests "
+                f"({digest_result['failed']} failed out of {digest_result['total']} total)")
+
+
+def _email(results: dict, hours: int, top_n: int) -> None:
+    email_result = send_digest_email(hours=hours, top_n=top_n)
+    results["email"] = email_result
+    if email_result["success"]:
+        logger.info(f"✓ Email sent successfully with {email_result['articles_count']} articles")
+        results["success"] = True
+    else:
+        logger.error(f"✗ Failed to send email: {email_result.get('error', 'Unknown error')}")
+
+
+def pipeline_stages(results: dict, hours: int, top_n: int, mode: str = "dag") -> List[Stage]:
+    """
+    scraping ─┬─ anthropic_markdown (Docling, CPU) ──┬─ digests ── email
+              └─ youtube_transcripts (network) ──────┘
+    In "stream" mode the first stage is the streaming pipeline (new items end to end); the
+    batch stages after it only pick up older leftovers, so they are usually near-instant.
+    """
+    if mode not in ("dag", "stream"):
+        raise ValueError(f"Unknown PIPELINE_MODE: {mode!r} (expected 'dag' or 'stream')")
+    first = "stream" if mode == "stream" else "scraping"
+    return [
+        Stage(first, (lambda: _stream(results, hours)) if mode == "stream" else (lambda: _scrape(results, hours))),
+        Stage("anthropic_markdown", lambda: _anthropic_markdown(results), deps=[first]),
+        Stage("youtube_transcripts", lambda: _youtube_transcripts(results), deps=[first]),
+        Stage("digests", lambda: _digests(results), deps=["anthropic_markdown", "youtube_transcripts"]),
+        Stage("email", lambda: _email(results, hours, top_n), deps=["digests"]),
+    ]
+
+
+def run_daily_pipeline(hours: int = 24, top_n: int = 10, report_path: str = RUN_REPORT_PATH,
+                       prometheus_path: str = PROMETHEUS_TEXTFILE_PATH,
+                       stage_workers: int = PIPELINE_STAGE_WORKERS, mode: str = PIPELINE_MODE) -> dict:
+    METRICS.reset()
     start_time = datetime.now()
     logger.info("=" * 60)
     logger.info("Starting Daily AI News Aggregator Pipeline")
@@ -34,44 +121,15 @@ def run_daily_pipeline(hours: int = 24, top_n: int = 10) -> dict:
     }
     
     try:
-        logger.info("\n[1/5] Scraping articles from sources...")
-        scraping_results = run_scrapers(hours=hours)
-        results["scraping"] = {
-            "youtube": len(scraping_results.get("youtube", [])),
-            "openai": len(scraping_results.get("openai", [])),
-            "anthropic": len(scraping_results.get("anthropic", []))
+        outcome = run_dag(pipeline_stages(results, hours, top_n, mode), max_workers=stage_workers)
+        results["stages"] = {
+            name: {k: v for k, v in record.items() if k != "result"}
+            for name, record in outcome["stages"].items()
         }
-        logger.info(f"✓ Scraped {results['scraping']['youtube']} YouTube videos, "
-                    f"{results['scraping']['openai']} OpenAI articles, "
-                    f"{results['scraping']['anthropic']} Anthropic articles")
-        
-        logger.info("\n[2/5] Processing Anthropic markdown...")
-        anthropic_result = process_anthropic_markdown()
-        results["processing"]["anthropic"] = anthropic_result
-        logger.info(f"✓ Processed {anthropic_result['processed']} Anthropic articles "
-                    f"({anthropic_result['failed']} failed)")
-        
-        logger.info("\n[3/5] Processing YouTube transcripts...")
-        youtube_result = process_youtube_transcripts()
-        results["processing"]["youtube"] = youtube_result
-        logger.info(f"✓ Processed {youtube_result['processed']} transcripts "
-                    f"({youtube_result['unavailable']} unavailable)")
-        
-        logger.info("\n[4/5] Creating digests for articles...")
-        digest_result = process_digests()
-        results["digests"] = digest_result
-        logger.info(f"✓ Created {digest_result['processed']} digests "
-                    f"({digest_result['failed']} failed out of {digest_result['total']} total)")
-        
-        logger.info("\n[5/5] Generating and sending email digest...")
-        email_result = send_digest_email(hours=hours, top_n=top_n)
-        results["email"] = email_result
-        
-        if email_result["success"]:
-            logger.info(f"✓ Email sent successfully with {email_result['articles_count']} articles")
-            results["success"] = True
-        else:
-            logger.error(f"✗ Failed to send email: {email_result.get('error', 'Unknown error')}")
+        results["critical_path"] = outcome["critical_path"]
+        failed = [f"{name}: {r['error']}" for name, r in outcome["stages"].items() if r["status"] == "failed"]
+        if failed:
+            results["error"] = "; ".join(failed)
         
     except Exception as e:
         logger.error(f"Pipeline failed with error: {e}", exc_info=True)
@@ -81,6 +139,8 @@ def run_daily_pipeline(hours: int = 24, top_n: int = 10) -> dict:
     duration = (end_time - start_time).total_seconds()
     results["end_time"] = end_time.isoformat()
     results["duration_seconds"] = duration
+    results["db_pool"] = get_pool_metrics()
+    results["metrics"] = METRICS.snapshot()
     
     logger.info("\n" + "=" * 60)
     logger.info("Pipeline Summary")
@@ -89,9 +149,29 @@ def run_daily_pipeline(hours: int = 24, top_n: int = 10) -> dict:
     logger.info(f"Scraped: {results['scraping']}")
     logger.info(f"Processed: {results['processing']}")
     logger.info(f"Digests: {results['digests']}")
+    logger.info(f"DB pool: {results['db_pool']}")
     logger.info(f"Email: {'Sent' if results['success'] else 'Failed'}")
+    for name, stage in results.get("stages", {}).items():
+        timing = f"{stage['seconds']:.1f}s (from +{stage['started_offset_seconds']:.1f}s)" if "seconds" in stage else "-"
+        logger.info(f"Stage {name}: {stage['status']} {timing}")
+    if "critical_path" in results:
+        path = results["critical_path"]
+        logger.info(f"Critical path: {' → '.join(path['stages'])} = {path['seconds']:.1f}s "
+                    f"(wall {path['wall_seconds']:.1f}s, stages total {path['stage_seconds_total']:.1f}s)")
+    for name, op in results["metrics"]["operations"].items():
+        logger.info(f"  {name}: {op['calls']} calls, {op['errors']} errors, {op['seconds_total']:.1f}s total")
     logger.info("=" * 60)
     
+    # The report must never turn a finished run into a failed one
+    try:
+        if report_path:
+            write_run_report(results, report_path)
+            logger.info(f"Run report written to {report_path}")
+        if prometheus_path:
+            write_prometheus_textfile(prometheus_path, results)
+    except OSError as e:
+        logger.error(f"Could not write run report: {e}")
+    
     return results
 
 
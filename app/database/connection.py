@@ -1,21 +1,165 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
 
 load_dotenv()
 
 def get_database_url() -> str:
+    """
+    DATABASE_URL wins when set, e.g. sqlite:///news.db for a local run with no Postgres.
+    Otherwise the URL is built from the POSTGRES_* variables.
+    """
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return url
     user = os.getenv("POSTGRES_USER", "postgres")
     password = os.getenv("POSTGRES_PASSWORD", "postgres")
     host = os.getenv("POSTGRES_HOST", "localhost")
     port = os.getenv("POSTGRES_PORT", "5432")
     db = os.getenv("POSTGRES_DB", "ai_news_aggregator")
-    return f"postgresql://{user}:{password}@{host}:{port}/{db}"
+    return f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{db}"
+
+
+def is_sqlite_url(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def get_pool_settings(url: str = None) -> dict:
+    """
+    Pool tuning from the environment. Size it for the concurrent stages:
+    DB_POOL_SIZE + DB_MAX_OVERFLOW should cover every thread/worker holding a session at once.
+    SQLite keeps SQLAlchemy's default pool; only the thread check is relaxed (sessions move
+    between the runner's threads, one at a time).
+    """
+    if is_sqlite_url(url or get_database_url()):
+        return {"connect_args": {"check_same_thread": False}}
+    settings = {
+        "poolclass": _InstrumentedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),   # seconds; avoids server/firewall idle disconnects
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+    if os.getenv("DB_EXECUTEMANY_BATCH", "false").lower() == "true":
+        # psycopg2 execute_batch for executemany UPDATE/DELETE on top of multi-row INSERT ... VALUES
+        settings["executemany_mode"] = "values_plus_batch"
+    return settings
+
+
+#===================================================================================
+# Pool metrics: checkouts, new connections, and how long callers waited for a free connection.
+#===================================================================================
+class PoolMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self.lock:
+            self.total_wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checkouts - self.checkins,
+                "connects": self.connects,
+                "total_wait_seconds": self.total_wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+                "avg_wait_seconds": self.total_wait_seconds / self.checkouts if self.checkouts else 0.0,
+            }
+
+
+POOL_METRICS = PoolMetrics()
+
+
+class _InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_METRICS.record_wait(time.perf_counter() - started)
+
+
+def _configure_sqlite(engine: Engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")      # readers don't block the writer
+        cursor.execute("PRAGMA busy_timeout=30000")    # wait for the write lock instead of failing
+        cursor.close()
+
+
+def _attach_pool_metrics(engine: Engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        with POOL_METRICS.lock:
+            POOL_METRICS.connects += 1
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with POOL_METRICS.lock:
+            POOL_METRICS.checkouts += 1
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        with POOL_METRICS.lock:
+            POOL_METRICS.checkins += 1
+
+
+#===================================================================================
+# Engine is created on first use, not at import: importing app modules costs no DB setup.
+#===================================================================================
+_engine = None
+_session_factory = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    global _engine, _session_factory
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                url = get_database_url()
+                engine = create_engine(url, **get_pool_settings(url))
+                if is_sqlite_url(url):
+                    _configure_sqlite(engine)
+                _attach_pool_metrics(engine)
+                _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                _engine = engine
+    return _engine
 
-engine = create_engine(get_database_url())
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_session():
-    return SessionLocal()
+    get_engine()
+    return _session_factory()
+
+
+def get_pool_metrics() -> dict:
+    metrics = POOL_METRICS.snapshot()
+    if _engine is not None:
+        metrics["status"] = _engine.pool.status()
+    return metrics
+
 
+def __getattr__(name: str):
+    # Backwards compatible `from app.database.connection import engine / SessionLocal`, still lazy.
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        get_engine()
+        return _session_factory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
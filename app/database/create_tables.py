@@ -4,9 +4,14 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from app.database.models import Base
-from app.database.connection import engine
+from app.database.connection import get_engine
 
 if __name__ == "__main__":
+    engine = get_engine()
     Base.metadata.create_all(engine)
+    # create_all only builds indexes together with new tables; add any missing ones to existing tables too.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
     print("Tables created successfully")
 
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, String, DateTime, Text
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, String, DateTime, Text, Integer, Index, text
+from sqlalchemy.orm import declarative_base, deferred
 
 Base = declarative_base()
 
@@ -15,8 +15,14 @@ class YouTubeVideo(Base):
     channel_id = Column(String, nullable=False)
     published_at = Column(DateTime, nullable=False)
     description = Column(Text)
-    transcript = Column(Text, nullable=True)
+    transcript = deferred(Column(Text, nullable=True))   # can be 100s of KB: only loaded when accessed
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Partial index: only the handful of videos still waiting for a transcript are indexed.
+        Index("ix_youtube_videos_transcript_pending", "video_id",
+              postgresql_where=text("transcript IS NULL"), sqlite_where=text("transcript IS NULL")),
+    )
 
 
 class OpenAIArticle(Base):
@@ -40,8 +46,13 @@ class AnthropicArticle(Base):
     description = Column(Text)
     published_at = Column(DateTime, nullable=False)
     category = Column(String, nullable=True)
-    markdown = Column(Text, nullable=True)
+    markdown = deferred(Column(Text, nullable=True))   # full article body: only loaded when accessed
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_anthropic_articles_markdown_pending", "guid",
+              postgresql_where=text("markdown IS NULL"), sqlite_where=text("markdown IS NULL")),
+    )
 
 
 class Digest(Base):
@@ -54,4 +65,36 @@ class Digest(Base):
     title = Column(String, nullable=False)
     summary = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_digests_article_type_article_id", "article_type", "article_id"),   # "has this article a digest?" anti-join
+        Index("ix_digests_created_at", "created_at"),                               # get_recent_digests window + ORDER BY
+    )
+
+
 
+class DigestJob(Base):
+    """
+    Work queue for digest generation, one row per article that needs a digest.
+    status: "pending" → "claimed" (leased by worker_id until leased_until) → "done" | "failed"
+    An expired lease makes a claimed job claimable again (worker crashed).
+    """
+    __tablename__ = "digest_jobs"
+    
+    id = Column(String, primary_key=True)   # same "article_type:article_id" key as Digest.id
+    article_type = Column(String, nullable=False)
+    article_id = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String, nullable=True)
+    leased_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_digest_jobs_article_type_article_id", "article_type", "article_id"),
+        Index("ix_digest_jobs_claimable", "created_at",
+              postgresql_where=text("status IN ('pending', 'claimed')"),
+              sqlite_where=text("status IN ('pending', 'claimed')")),
+    )
@@ -1,14 +1,39 @@
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from .models import YouTubeVideo, OpenAIArticle, AnthropicArticle, Digest
+from typing import List, Optional, Dict, Any, Iterator, Tuple, Union
+from sqlalchemy import select, update, bindparam, case, exists, func, literal, true, union_all, or_, and_, values, column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only
+from .models import YouTubeVideo, OpenAIArticle, AnthropicArticle, Digest, DigestJob
 from .connection import get_session
+from app.metrics import METRICS
+
+BULK_INSERT_CHUNK_SIZE = 1000   # rows per INSERT statement, keeps bind-parameter count well under Postgres' limit
+BULK_UPDATE_CHUNK_SIZE = 500    # rows per UPDATE statement (and per COMMIT) in the batched update methods
+
+# Listing/pending-work queries only need ids and URLs. Anything else is loaded on first access.
+PENDING_YOUTUBE_COLUMNS = (YouTubeVideo.video_id, YouTubeVideo.title, YouTubeVideo.url)
+PENDING_ANTHROPIC_COLUMNS = (AnthropicArticle.guid, AnthropicArticle.title, AnthropicArticle.url)
+
+
+def _utc_naive(value: datetime) -> datetime:
+    # DateTime columns are naive UTC (default=datetime.utcnow); aware values are converted, not just stripped
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 class Repository:
     def __init__(self, session: Optional[Session] = None):
         self.session = session or get_session()
 
+    def _insert(self, model):
+        # Postgres and SQLite (3.35+) both support INSERT ... ON CONFLICT DO NOTHING RETURNING
+        if self.session.get_bind().dialect.name == "sqlite":
+            return sqlite_insert(model)
+        return pg_insert(model)
+
 
     #===================================================================================
     # Add one YouTube video to database.
@@ -86,81 +111,95 @@ class Repository:
 
 
 
+    #===================================================================================
+    # Set-based "insert if new": one INSERT ... ON CONFLICT DO NOTHING per chunk.
+    #===================================================================================
+    def _bulk_insert_new(self, model, key: str, rows: List[dict], return_keys: bool = False) -> Union[int, List[str]]:
+        """
+        Returns:
+            Number of rows actually inserted (RETURNING only yields rows that were new),
+            or their keys with return_keys=True (the streaming pipeline only forwards new items)
+        SQL (per chunk of BULK_INSERT_CHUNK_SIZE rows):
+            INSERT INTO <table> (...) VALUES (...), (...), ...
+            ON CONFLICT DO NOTHING
+            RETURNING <key>
+        """
+        if not rows:
+            return [] if return_keys else 0
+        key_column = getattr(model, key)
+        inserted = []
+        with METRICS.timer(f"db_write.insert.{model.__tablename__}") as op:
+            for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + BULK_INSERT_CHUNK_SIZE]
+                stmt = self._insert(model).values(chunk).on_conflict_do_nothing().returning(key_column)
+                inserted.extend(self.session.execute(stmt).scalars())
+            self.session.commit()
+            op["rows"] = len(inserted)
+            op["skipped"] = len(rows) - len(inserted)
+        return inserted if return_keys else len(inserted)
+
+
     #===================================================================================
     # Add multiple videos efficiently (single transaction).
     #===================================================================================
-    def bulk_create_youtube_videos(self, videos: List[dict]) -> int:
+    def bulk_create_youtube_videos(self, videos: List[dict], return_keys: bool = False) -> Union[int, List[str]]:
         """
         Args:
             videos: List of dicts with video data
+            return_keys: return the NEW video_ids instead of their count
         
         Returns:
             Number of NEW videos created (skips duplicates)
         
         Why bulk?
-            Individual: 50 videos = 50 INSERT queries (slow)
-            Bulk: 50 videos = 1 INSERT query (fast!)
-        """
-        new_videos = []
-        for v in videos:
-            existing = self.session.query(YouTubeVideo).filter_by(video_id=v["video_id"]).first()
-            if not existing:
-                new_videos.append(YouTubeVideo(
-                    video_id=v["video_id"],
-                    title=v["title"],
-                    url=v["url"],
-                    channel_id=v.get("channel_id", ""),
-                    published_at=v["published_at"],
-                    description=v.get("description", ""),
-                    transcript=v.get("transcript")
-                ))
-        if new_videos:
-            self.session.add_all(new_videos)
-            self.session.commit()
-        return len(new_videos)
+            Individual: 50 videos = 50 SELECTs + 50 INSERTs (slow)
+            Bulk: 50 videos = 1 INSERT ... ON CONFLICT DO NOTHING (fast!)
+        """
+        return self._bulk_insert_new(YouTubeVideo, "video_id", [
+            {
+                "video_id": v["video_id"],
+                "title": v["title"],
+                "url": v["url"],
+                "channel_id": v.get("channel_id", ""),
+                "published_at": v["published_at"],
+                "description": v.get("description", ""),
+                "transcript": v.get("transcript")
+            }
+            for v in videos
+        ], return_keys=return_keys)
 
 
     #===================================================================================
          #same pattern as bulk_create_youtube_videos
     #===================================================================================
-    def bulk_create_openai_articles(self, articles: List[dict]) -> int:
-        new_articles = []
-        for a in articles:
-            existing = self.session.query(OpenAIArticle).filter_by(guid=a["guid"]).first()
-            if not existing:
-                new_articles.append(OpenAIArticle(
-                    guid=a["guid"],
-                    title=a["title"],
-                    url=a["url"],
-                    published_at=a["published_at"],
-                    description=a.get("description", ""),
-                    category=a.get("category")
-                ))
-        if new_articles:
-            self.session.add_all(new_articles)
-            self.session.commit()
-        return len(new_articles)
-
-
-    #===================================================================================
-    #===================================================================================
-    def bulk_create_anthropic_articles(self, articles: List[dict]) -> int:
-        new_articles = []
-        for a in articles:
-            existing = self.session.query(AnthropicArticle).filter_by(guid=a["guid"]).first()
-            if not existing:
-                new_articles.append(AnthropicArticle(
-                    guid=a["guid"],
-                    title=a["title"],
-                    url=a["url"],
-                    published_at=a["published_at"],
-                    description=a.get("description", ""),
-                    category=a.get("category")
-                ))
-        if new_articles:
-            self.session.add_all(new_articles)
-            self.session.commit()
-        return len(new_articles)
+    def bulk_create_openai_articles(self, articles: List[dict], return_keys: bool = False) -> Union[int, List[str]]:
+        return self._bulk_insert_new(OpenAIArticle, "guid", [
+            {
+                "guid": a["guid"],
+                "title": a["title"],
+                "url": a["url"],
+                "published_at": a["published_at"],
+                "description": a.get("description", ""),
+                "category": a.get("category")
+            }
+            for a in articles
+        ], return_keys=return_keys)
+
+
+    #===================================================================================
+    #===================================================================================
+    def bulk_create_anthropic_articles(self, articles: List[dict], return_keys: bool = False) -> Union[int, List[str]]:
+        return self._bulk_insert_new(AnthropicArticle, "guid", [
+            {
+                "guid": a["guid"],
+                "title": a["title"],
+                "url": a["url"],
+                "published_at": a["published_at"],
+                "description": a.get("description", ""),
+                "category": a.get("category")
+            }
+            for a in articles
+        ], return_keys=return_keys)
 
 
     #===================================================================================
@@ -173,10 +212,13 @@ class Repository:
             2. Later, fetch full markdown from URL (slow)
             3. This finds articles needing step 2
         SQL:
-            SELECT * FROM anthropic_articles 
+            SELECT guid, title, url FROM anthropic_articles 
             WHERE markdown IS NULL
+        Only the columns the markdown step needs are loaded (see PENDING_ANTHROPIC_COLUMNS).
         """
-        query = self.session.query(AnthropicArticle).filter(AnthropicArticle.markdown.is_(None))
+        query = self.session.query(AnthropicArticle).options(
+            load_only(*PENDING_ANTHROPIC_COLUMNS)
+        ).filter(AnthropicArticle.markdown.is_(None))
         if limit:
             query = query.limit(limit)
         return query.all()
@@ -204,7 +246,7 @@ class Repository:
          # videos missing transcripts.
     #===================================================================================
     def get_youtube_videos_without_transcript(self, limit: Optional[int] = None) -> List[YouTubeVideo]:
-         """
+        """
         Find videos missing transcripts.
         Why?
             Two-stage processing:
@@ -212,11 +254,14 @@ class Repository:
             2. Fetch transcript later (slow)
         This finds videos stuck at stage 1.
         SQL Generated:
-            SELECT * FROM youtube_videos 
+            SELECT video_id, title, url FROM youtube_videos 
             WHERE transcript IS NULL
             LIMIT 10
+        Only the columns the transcript step needs are loaded (see PENDING_YOUTUBE_COLUMNS).
         """
-        query = self.session.query(YouTubeVideo).filter(YouTubeVideo.transcript.is_(None))
+        query = self.session.query(YouTubeVideo).options(
+            load_only(*PENDING_YOUTUBE_COLUMNS)
+        ).filter(YouTubeVideo.transcript.is_(None))
         if limit:
             query = query.limit(limit)
         return query.all()
@@ -243,6 +288,65 @@ class Repository:
         return False
 
 
+    #===================================================================================
+    # Batched versions of the two update methods above: one UPDATE statement + one commit per chunk.
+    #===================================================================================
+    def update_youtube_video_transcripts(self, transcripts: List[Tuple[str, str]],
+                                         chunk_size: int = BULK_UPDATE_CHUNK_SIZE) -> int:
+        """
+        Args:
+            transcripts: [(video_id, transcript or "__UNAVAILABLE__"), ...]
+        Returns:
+            Number of videos updated
+        """
+        return self._bulk_update_column(YouTubeVideo, "video_id", "transcript", transcripts, chunk_size)
+
+
+    def update_anthropic_articles_markdown(self, articles: List[Tuple[str, str]],
+                                           chunk_size: int = BULK_UPDATE_CHUNK_SIZE) -> int:
+        """
+        Args:
+            articles: [(guid, markdown), ...]
+        Returns:
+            Number of articles updated
+        """
+        return self._bulk_update_column(AnthropicArticle, "guid", "markdown", articles, chunk_size)
+
+
+    def _bulk_update_column(self, model, key: str, field: str, pairs: List[Tuple[str, str]], chunk_size: int) -> int:
+        """
+        SQL (Postgres, one statement per chunk, then COMMIT):
+            UPDATE <table> SET <field> = batch._value
+            FROM (VALUES (:k1, :v1), (:k2, :v2), ...) AS batch (_key, _value)
+            WHERE <table>.<key> = batch._key
+        1,000 updates = 1,000 / chunk_size round-trips and fsyncs instead of 2,000 queries + 1,000 commits.
+        SQLite can't alias VALUES columns, so it gets an executemany of
+        UPDATE <table> SET <field> = :value WHERE <key> = :key per chunk (in-process, no round-trips to save).
+        """
+        table = model.__table__
+        sqlite = self.session.get_bind().dialect.name == "sqlite"
+        per_row = update(table).where(table.c[key] == bindparam("_key")).values({field: bindparam("_value")})
+        exact_count = self.session.get_bind().dialect.supports_sane_multi_rowcount
+        updated = 0
+        with METRICS.timer(f"db_write.update.{table.name}") as op:
+            for start in range(0, len(pairs), chunk_size):
+                chunk = pairs[start:start + chunk_size]
+                if sqlite:
+                    result = self.session.execute(per_row, [{"_key": k, "_value": v} for k, v in chunk])
+                    updated += result.rowcount if exact_count else len(chunk)
+                else:
+                    batch = values(column("_key", table.c[key].type), column("_value", table.c[field].type),
+                                   name="batch").data(chunk)
+                    result = self.session.execute(
+                        update(table).where(table.c[key] == batch.c._key).values({field: batch.c._value})
+                    )
+                    updated += result.rowcount   # one statement: always the real count
+                self.session.commit()
+            op["rows"] = updated
+            op["bytes"] = sum(len(v.encode("utf-8")) for _, v in pairs)
+        return updated
+
+
     #===================================================================================
     # Find ALL articles (YouTube, OpenAI, Anthropic) that need digests.
     #===================================================================================
@@ -289,61 +393,232 @@ class Repository:
                                       openai:jkl012 ✓ (not in digests)
                                       anthropic:mno345 ✓ (not in digests)
         """
-        articles = []
-        seen_ids = set()
-        
-        digests = self.session.query(Digest).all()
-        for d in digests:
-            seen_ids.add(f"{d.article_type}:{d.article_id}")
-        
-        youtube_videos = self.session.query(YouTubeVideo).filter(
+        return list(self.iter_articles_without_digest(limit=limit))
+
+
+    #===================================================================================
+    # One SELECT per source producing the common digest-input shape, keyed by article type.
+    #===================================================================================
+    def _digestible_article_selects(self) -> Dict[str, Any]:
+        """
+        Returns:
+            {"youtube": (select, id_column), "openai": (...), "anthropic": (...)}
+            Each select yields: type, id, title, url, content, published_at
+        """
+        def first_non_empty(*columns):   # SQL version of `a or b or ""`
+            return func.coalesce(*[func.nullif(c, "") for c in columns], "")
+
+        youtube = select(
+            literal("youtube").label("type"),
+            YouTubeVideo.video_id.label("id"),
+            YouTubeVideo.title,
+            YouTubeVideo.url,
+            first_non_empty(YouTubeVideo.transcript, YouTubeVideo.description).label("content"),
+            YouTubeVideo.published_at,
+        ).where(
             YouTubeVideo.transcript.isnot(None),
-            YouTubeVideo.transcript != "__UNAVAILABLE__"
-        ).all()
-        for video in youtube_videos:
-            key = f"youtube:{video.video_id}"
-            if key not in seen_ids:
-                articles.append({
-                    "type": "youtube",
-                    "id": video.video_id,
-                    "title": video.title,
-                    "url": video.url,
-                    "content": video.transcript or video.description or "",
-                    "published_at": video.published_at
-                })
-        
-        openai_articles = self.session.query(OpenAIArticle).all()
-        for article in openai_articles:
-            key = f"openai:{article.guid}"
-            if key not in seen_ids:
-                articles.append({
-                    "type": "openai",
-                    "id": article.guid,
-                    "title": article.title,
-                    "url": article.url,
-                    "content": article.description or "",
-                    "published_at": article.published_at
-                })
-        
-        anthropic_articles = self.session.query(AnthropicArticle).filter(
-            AnthropicArticle.markdown.isnot(None)
-        ).all()
-        for article in anthropic_articles:
-            key = f"anthropic:{article.guid}"
-            if key not in seen_ids:
-                articles.append({
-                    "type": "anthropic",
-                    "id": article.guid,
-                    "title": article.title,
-                    "url": article.url,
-                    "content": article.markdown or article.description or "",
-                    "published_at": article.published_at
-                })
-        
+            YouTubeVideo.transcript != "__UNAVAILABLE__",
+        )
+        openai = select(
+            literal("openai").label("type"),
+            OpenAIArticle.guid.label("id"),
+            OpenAIArticle.title,
+            OpenAIArticle.url,
+            first_non_empty(OpenAIArticle.description).label("content"),
+            OpenAIArticle.published_at,
+        )
+        anthropic = select(
+            literal("anthropic").label("type"),
+            AnthropicArticle.guid.label("id"),
+            AnthropicArticle.title,
+            AnthropicArticle.url,
+            first_non_empty(AnthropicArticle.markdown, AnthropicArticle.description).label("content"),
+            AnthropicArticle.published_at,
+        ).where(AnthropicArticle.markdown.isnot(None))
+        return {
+            "youtube": (youtube, YouTubeVideo.video_id),
+            "openai": (openai, OpenAIArticle.guid),
+            "anthropic": (anthropic, AnthropicArticle.guid),
+        }
+
+
+    #===================================================================================
+    # Streaming version of get_articles_without_digest: the "no digest yet" check runs in SQL.
+    #===================================================================================
+    def iter_articles_without_digest(self, limit: Optional[int] = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Same dicts as get_articles_without_digest, fetched batch_size rows at a time.
+        SQL:
+            SELECT 'youtube', video_id, ... FROM youtube_videos v
+            WHERE transcript IS NOT NULL AND transcript != '__UNAVAILABLE__'
+              AND NOT EXISTS (SELECT 1 FROM digests d WHERE d.article_type = 'youtube' AND d.article_id = v.video_id)
+            UNION ALL
+            SELECT 'openai', guid, ... FROM openai_articles ... NOT EXISTS (...)
+            UNION ALL
+            SELECT 'anthropic', guid, ... FROM anthropic_articles WHERE markdown IS NOT NULL AND NOT EXISTS (...)
+            ORDER BY published_at DESC, type, id
+            LIMIT :limit
+        Newest first, so a limited run digests today's items before the backlog; type/id make ties stable.
+        yield_per keeps a server-side cursor open (psycopg2) until the iterator is exhausted, so it
+        runs on its own session: commits on self.session while iterating can't invalidate it.
+        """
+        query = self._articles_without_digest_query()
+        columns = query.selected_columns
+        query = query.order_by(columns.published_at.desc(), columns.type, columns.id)
         if limit:
-            articles = articles[:limit]
+            query = query.limit(limit)
+
+        session = Session(bind=self.session.get_bind())   # same database, separate connection
+        try:
+            result = session.execute(query.execution_options(yield_per=batch_size))
+            for row in result.mappings():
+                yield dict(row)
+        finally:
+            session.close()
+
+
+    def _articles_without_digest_query(self, without_job: bool = False):
+        """UNION ALL of the three sources, NOT EXISTS against digests (and digest_jobs if without_job)."""
+        selects = []
+        for article_type, (article_select, id_column) in self._digestible_article_selects().items():
+            conditions = [~exists().where(Digest.article_type == article_type, Digest.article_id == id_column)]
+            if without_job:
+                conditions.append(~exists().where(DigestJob.article_type == article_type, DigestJob.article_id == id_column))
+            selects.append(article_select.where(*conditions))
+        return union_all(*selects)
+
+
+    #===================================================================================
+    # Digest work queue: enqueue → claim (SKIP LOCKED + lease) → ack / fail.
+    #===================================================================================
+    def enqueue_digest_jobs(self) -> int:
+        """
+        Adds a pending job for every digestible article that has neither a digest nor a job.
+        Safe to run from every worker at once (ON CONFLICT DO NOTHING on the job id).
+        SQL:
+            INSERT INTO digest_jobs (id, article_type, article_id, status, attempts, ...)
+            SELECT type || ':' || id, type, id, 'pending', 0, ... FROM <articles without digest or job>
+            ON CONFLICT DO NOTHING
+            RETURNING id
+        """
+        now = datetime.utcnow()
+        pending = self._articles_without_digest_query(without_job=True).subquery()
+        stmt = self._insert(DigestJob).from_select(
+            ["id", "article_type", "article_id", "status", "attempts", "created_at", "updated_at"],
+            select(
+                pending.c.type + ":" + pending.c.id,
+                pending.c.type,
+                pending.c.id,
+                literal("pending"),
+                literal(0),
+                literal(now),
+                literal(now),
+            ).where(true())   # SQLite can't parse INSERT ... SELECT ... ON CONFLICT without a WHERE
+        ).on_conflict_do_nothing().returning(DigestJob.id)
+        with METRICS.timer("db_write.insert.digest_jobs") as op:
+            queued = len(self.session.execute(stmt).all())
+            self.session.commit()
+            op["rows"] = queued
+        return queued
+
+
+    def claim_digest_jobs(self, worker_id: str, batch_size: int = 10, lease_seconds: int = 600,
+                          max_attempts: int = 3) -> List[Dict[str, Any]]:
+        """
+        Leases up to batch_size jobs to worker_id and returns their articles (same dicts as
+        get_articles_without_digest, plus "job_id"). Rows locked by other workers are skipped,
+        so concurrent workers on any node never claim the same job.
+        Housekeeping first:
+            - claimable jobs whose article already has a digest (process_digests, stream,
+              daemon sweep) → "done", no LLM call
+            - leases that expired on the last attempt → "failed" (never claimable again)
+        SQL:
+            SELECT * FROM digest_jobs j
+            WHERE (status = 'pending' OR (status = 'claimed' AND leased_until < now))
+              AND attempts < :max_attempts
+              AND NOT EXISTS (SELECT 1 FROM digests d WHERE d.id = j.id)
+            ORDER BY created_at
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        Jobs whose article is gone (or no longer digestible) are marked "failed" instead of
+        staying leased; if a whole batch is like that, the next batch is claimed.
+        """
+        now = datetime.utcnow()
+        claimable = or_(
+            DigestJob.status == "pending",
+            and_(DigestJob.status == "claimed", DigestJob.leased_until < now),
+        )
+        has_digest = exists().where(Digest.id == DigestJob.id)   # same "type:id" key
+        self.session.query(DigestJob).filter(claimable, has_digest).update(
+            {"status": "done", "leased_until": None, "updated_at": now}, synchronize_session=False
+        )
+        self.session.query(DigestJob).filter(
+            DigestJob.status == "claimed", DigestJob.leased_until < now, DigestJob.attempts >= max_attempts
+        ).update(
+            {"status": "failed", "leased_until": None, "last_error": "lease expired on the last attempt", "updated_at": now},
+            synchronize_session=False
+        )
+        self.session.commit()
         
-        return articles
+        while True:
+            jobs = self.session.query(DigestJob).filter(
+                claimable, DigestJob.attempts < max_attempts, ~has_digest
+            ).order_by(DigestJob.created_at).limit(batch_size).with_for_update(skip_locked=True).all()
+            
+            for job in jobs:
+                job.status = "claimed"
+                job.worker_id = worker_id
+                job.leased_until = now + timedelta(seconds=lease_seconds)
+                job.attempts += 1
+            self.session.commit()   # releases the row locks, the lease now protects the jobs
+            
+            if not jobs:
+                return []
+            
+            job_ids = {(job.article_type, job.article_id): job.id for job in jobs}
+            selects = []
+            for article_type, (article_select, id_column) in self._digestible_article_selects().items():
+                ids = [article_id for (t, article_id) in job_ids if t == article_type]
+                if ids:
+                    selects.append(article_select.where(id_column.in_(ids)))
+            rows = self.session.execute(union_all(*selects)).mappings().all() if selects else []
+            articles = [dict(row, job_id=job_ids[(row["type"], row["id"])]) for row in rows]
+            
+            missing = set(job_ids.values()) - {a["job_id"] for a in articles}
+            if missing:
+                self.session.query(DigestJob).filter(DigestJob.id.in_(missing)).update(
+                    {"status": "failed", "leased_until": None, "last_error": "article missing or no longer digestible",
+                     "updated_at": now}, synchronize_session=False
+                )
+                self.session.commit()
+            if articles:
+                return articles
+
+
+    def ack_digest_job(self, job_id: str, worker_id: str) -> bool:
+        """False if the lease was lost (expired and re-claimed): the current holder owns the job now."""
+        updated = self.session.query(DigestJob).filter(
+            DigestJob.id == job_id, DigestJob.worker_id == worker_id, DigestJob.status == "claimed"
+        ).update(
+            {"status": "done", "leased_until": None, "last_error": None, "updated_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+        self.session.commit()
+        return updated > 0
+
+
+    def fail_digest_job(self, job_id: str, worker_id: str, error: str, max_attempts: int = 3) -> bool:
+        """Back to pending for another try, or "failed" for good once max_attempts is reached.
+        Like ack, a no-op (False) for a worker that no longer holds the lease."""
+        updated = self.session.query(DigestJob).filter(
+            DigestJob.id == job_id, DigestJob.worker_id == worker_id, DigestJob.status == "claimed"
+        ).update(
+            {"status": case((DigestJob.attempts >= max_attempts, "failed"), else_="pending"),
+             "leased_until": None, "last_error": error, "updated_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+        self.session.commit()
+        return updated > 0
 
 
     #===================================================================================
@@ -370,16 +645,11 @@ class Repository:
             - article_id alone might not be unique across sources
         """
         digest_id = f"{article_type}:{article_id}"
-        existing = self.session.query(Digest).filter_by(id=digest_id).first()
-        if existing:
-            return None
         
         if published_at:
-            if published_at.tzinfo is None:
-                published_at = published_at.replace(tzinfo=timezone.utc)
-            created_at = published_at
+            created_at = _utc_naive(published_at)
         else:
-            created_at = datetime.now(timezone.utc)
+            created_at = datetime.utcnow()
         
         digest = Digest(
             id=digest_id,
@@ -391,7 +661,14 @@ class Repository:
             created_at=created_at
         )
         self.session.add(digest)
-        self.session.commit()
+        with METRICS.timer("db_write.insert.digests") as op:
+            try:
+                self.session.commit()
+                op["rows"] = 1
+            except IntegrityError:   # already exists: the primary key decides, no check-then-insert race between workers
+                self.session.rollback()
+                op["skipped"] = 1
+                return None
         return digest
 
 
@@ -418,7 +695,7 @@ class Repository:
             WHERE created_at >= NOW() - INTERVAL '24 hours'
             ORDER BY created_at DESC
         """
-        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         digests = self.session.query(Digest).filter(
             Digest.created_at >= cutoff_time
         ).order_by(Digest.created_at.desc()).all()
@@ -0,0 +1,170 @@
+"""
+Run Metrics - per-stage and per-call timing, counters and the run report
+
+Purpose:
+    One process-wide registry (METRICS) that the pipeline's stages and external calls
+    report into, so a run can be read from a JSON report (or Prometheus) instead of logs.
+
+What is recorded:
+    stages      wall time, start offset and outcome of each run_daily_pipeline stage
+    operations  per external call type (feed_fetch, transcript_fetch, docling_convert,
+                llm_call.<schema>, db_write.<kind>.<table>, smtp_send):
+                calls, errors, seconds_total, seconds_max + free-form counters
+                (bytes, rows, retries, throttled, ...)
+
+Usage:
+    with METRICS.stage("digests"):
+        ...
+    with METRICS.timer("transcript_fetch") as op:
+        transcript = fetch()
+        op["bytes"] = len(transcript.text)
+    METRICS.add("transcript_fetch", retries=1)
+
+    write_run_report(results, "run_report.json")
+    write_prometheus_textfile("/var/lib/node_exporter/ai_news.prom", results)
+
+Thread-safe: fetch/LLM workers record from their own threads.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+
+class RunMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.started = time.perf_counter()
+            self.stages: Dict[str, dict] = {}
+            self.operations: Dict[str, dict] = {}
+
+    def _operation(self, name: str) -> dict:
+        # caller holds self.lock
+        if name not in self.operations:
+            self.operations[name] = {"calls": 0, "errors": 0, "seconds_total": 0.0, "seconds_max": 0.0}
+        return self.operations[name]
+
+    def record(self, name: str, seconds: float, error: bool = False, **counters) -> None:
+        with self.lock:
+            op = self._operation(name)
+            op["calls"] += 1
+            op["errors"] += int(error)
+            op["seconds_total"] += seconds
+            op["seconds_max"] = max(op["seconds_max"], seconds)
+            for key, value in counters.items():
+                op[key] = op.get(key, 0) + value
+
+    def add(self, name: str, **counters) -> None:
+        """Counters without a call (retries, cache hits, ...)."""
+        with self.lock:
+            op = self._operation(name)
+            for key, value in counters.items():
+                op[key] = op.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[dict]:
+        """Times the block as one call of `name`; counters put in the yielded dict are added to it."""
+        counters = {}
+        started = time.perf_counter()
+        try:
+            yield counters
+        except BaseException:
+            self.record(name, time.perf_counter() - started, error=True, **counters)
+            raise
+        self.record(name, time.perf_counter() - started, **counters)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            finished = time.perf_counter()
+            with self.lock:
+                self.stages[name] = {
+                    "started_offset_seconds": started - self.started,
+                    "seconds": finished - started,
+                    "ok": ok,
+                }
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+                "operations": {name: dict(op) for name, op in sorted(self.operations.items())},
+            }
+
+
+METRICS = RunMetrics()
+
+
+#===================================================================================
+# Output: JSON run report, Prometheus textfile (node_exporter textfile collector).
+#===================================================================================
+def _write_atomic(path: Path, payload: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(payload)
+    os.replace(tmp_path, path)   # readers (and node_exporter) never see half a file
+
+
+def write_run_report(results: dict, path: str) -> None:
+    _write_atomic(Path(path), json.dumps(results, indent=2, default=str))
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text(snapshot: dict, results: Optional[dict] = None, prefix: str = "ai_news") -> str:
+    lines = []
+
+    def metric(name: str, kind: str, help_text: str, samples: list) -> None:
+        if not samples:
+            return
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            lines.append(f"{prefix}_{name}{{{label_text}}} {float(value)}" if label_text else f"{prefix}_{name} {float(value)}")
+
+    stages = snapshot["stages"]
+    operations = snapshot["operations"]
+    metric("stage_duration_seconds", "gauge", "Wall time of each pipeline stage in the last run.",
+           [({"stage": name}, s["seconds"]) for name, s in stages.items()])
+    metric("stage_success", "gauge", "1 if the stage finished without raising.",
+           [({"stage": name}, int(s["ok"])) for name, s in stages.items()])
+
+    base_fields = ("calls", "errors", "seconds_total", "seconds_max")
+    metric("operation_calls", "gauge", "External calls in the last run.",
+           [({"operation": name}, op["calls"]) for name, op in operations.items()])
+    metric("operation_errors", "gauge", "External calls that failed in the last run.",
+           [({"operation": name}, op["errors"]) for name, op in operations.items()])
+    metric("operation_seconds", "gauge", "Total time spent in each call type in the last run.",
+           [({"operation": name}, op["seconds_total"]) for name, op in operations.items()])
+    metric("operation_seconds_max", "gauge", "Slowest single call of each type in the last run.",
+           [({"operation": name}, op["seconds_max"]) for name, op in operations.items()])
+    counter_names = sorted({k for op in operations.values() for k in op if k not in base_fields})
+    for counter in counter_names:
+        metric(f"operation_{counter}", "gauge", f"'{counter}' counted per call type in the last run.",
+               [({"operation": name}, op[counter]) for name, op in operations.items() if counter in op])
+
+    if results is not None:
+        metric("run_duration_seconds", "gauge", "Wall time of the last run.", [({}, results.get("duration_seconds", 0))])
+        metric("run_success", "gauge", "1 if the last run sent its email.", [({}, int(bool(results.get("success"))))])
+        metric("run_timestamp_seconds", "gauge", "Unix time the last run finished.", [({}, time.time())])
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(path: str, results: Optional[dict] = None) -> None:
+    _write_atomic(Path(path), prometheus_text(METRICS.snapshot(), results))
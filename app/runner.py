@@ -1,73 +1,127 @@
-from typing import List
-from .config import YOUTUBE_CHANNELS
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Union
+from urllib.parse import urlparse
+from .config import YOUTUBE_CHANNELS, SCRAPER_MAX_WORKERS, SCRAPER_PER_HOST_LIMIT
 from .scrapers.youtube import YouTubeScraper, ChannelVideo
 from .scrapers.openai import OpenAIScraper, OpenAIArticle
-from .scrapers.anthropic import AnthropicScraper, AnthropicArticle
+from .scrapers.anthropic import AnthropicScraper, AnthropicArticle, dedupe_articles
+from .scrapers.feed_state import FeedStateStore
 from .database.repository import Repository
 
 
-def run_scrapers(hours: int = 24) -> dict:
-    youtube_scraper = YouTubeScraper()
-    openai_scraper = OpenAIScraper()
-    anthropic_scraper = AnthropicScraper()
+#===================================================================================
+# Runs feed downloads on a thread pool, never more than `per_host_limit` at once against the same host.
+#===================================================================================
+class _FeedFetcher:
+    def __init__(self, max_workers: int, per_host_limit: int):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="feed")
+        self.per_host_limit = per_host_limit
+        self.host_slots = defaultdict(lambda: threading.BoundedSemaphore(self.per_host_limit))
+        self.lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        with self.lock:   # defaultdict insert is not atomic across threads
+            return self.host_slots[urlparse(url).netloc]
+
+    def submit(self, url: str, fn: Callable, *args, **kwargs):
+        slot = self._slot(url)
+
+        def run():
+            with slot:
+                return fn(*args, **kwargs)
+
+        return self.executor.submit(run)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.executor.shutdown(wait=True)
+
+
+def _video_rows(channel_id: str, videos: List[ChannelVideo]) -> List[dict]:
+    return [
+        {
+            "video_id": v.video_id,
+            "title": v.title,
+            "url": v.url,
+            "channel_id": channel_id,
+            "published_at": v.published_at,
+            "description": v.description,
+            "transcript": v.transcript
+        }
+        for v in videos
+    ]
+
+
+def _article_rows(articles: List[Union[OpenAIArticle, AnthropicArticle]]) -> List[dict]:
+    return [
+        {
+            "guid": a.guid,
+            "title": a.title,
+            "url": a.url,
+            "published_at": a.published_at,
+            "description": a.description,
+            "category": a.category
+        }
+        for a in articles
+    ]
+
+
+def run_scrapers(hours: int = 24, concurrent: bool = True,
+                 max_workers: int = SCRAPER_MAX_WORKERS, per_host_limit: int = SCRAPER_PER_HOST_LIMIT) -> dict:
+    feed_state = FeedStateStore()   # one shared store so concurrent fetches don't overwrite each other's file
+    youtube_scraper = YouTubeScraper(feed_state=feed_state)
+    openai_scraper = OpenAIScraper(feed_state=feed_state)
+    anthropic_scraper = AnthropicScraper(feed_state=feed_state)
     repo = Repository()
     
+    if not concurrent:   # sequential mode: same results, one download at a time
+        max_workers = per_host_limit = 1
+
+    with _FeedFetcher(max_workers=max_workers, per_host_limit=per_host_limit) as fetcher:
+        youtube_futures = [
+            fetcher.submit(youtube_scraper._get_rss_url(channel_id), youtube_scraper.get_latest_videos, channel_id, hours=hours)
+            for channel_id in YOUTUBE_CHANNELS
+        ]
+        openai_future = fetcher.submit(openai_scraper.rss_url, openai_scraper.get_articles, hours=hours)
+        # one task per Anthropic feed, each behind its own host slot
+        anthropic_futures = [
+            fetcher.submit(rss_url, anthropic_scraper.get_articles_from, rss_url, hours=hours)
+            for rss_url in anthropic_scraper.rss_urls
+        ]
+
+        # .result() keeps channel order and re-raises any fetch error, like the sequential loop did
+        channel_videos = [(channel_id, f.result()) for channel_id, f in zip(YOUTUBE_CHANNELS, youtube_futures)]
+        openai_articles = openai_future.result()
+        anthropic_articles = dedupe_articles([a for f in anthropic_futures for a in f.result()])
+    
     youtube_videos = []
     video_dicts = []
-    for channel_id in YOUTUBE_CHANNELS:
-        videos = youtube_scraper.get_latest_videos(channel_id, hours=hours)
+    for channel_id, videos in channel_videos:
         youtube_videos.extend(videos)
-        video_dicts.extend([
-            {
-                "video_id": v.video_id,
-                "title": v.title,
-                "url": v.url,
-                "channel_id": channel_id,
-                "published_at": v.published_at,
-                "description": v.description,
-                "transcript": v.transcript
-            }
-            for v in videos
-        ])
-    
-    openai_articles = openai_scraper.get_articles(hours=hours)
-    anthropic_articles = anthropic_scraper.get_articles(hours=hours)
+        video_dicts.extend(_video_rows(channel_id, videos))
     
     if video_dicts:
         repo.bulk_create_youtube_videos(video_dicts)
     
     if openai_articles:
-        article_dicts = [
-            {
-                "guid": a.guid,
-                "title": a.title,
-                "url": a.url,
-                "published_at": a.published_at,
-                "description": a.description,
-                "category": a.category
-            }
-            for a in openai_articles
-        ]
-        repo.bulk_create_openai_articles(article_dicts)
+        repo.bulk_create_openai_articles(_article_rows(openai_articles))
     
     if anthropic_articles:
-        article_dicts = [
-            {
-                "guid": a.guid,
-                "title": a.title,
-                "url": a.url,
-                "published_at": a.published_at,
-                "description": a.description,
-                "category": a.category
-            }
-            for a in anthropic_articles
-        ]
-        repo.bulk_create_anthropic_articles(article_dicts)
+        repo.bulk_create_anthropic_articles(_article_rows(anthropic_articles))
+    
+    # Validators/watermarks only after the rows are saved: a crash above must not turn unsaved entries into 304s.
+    feed_state.commit_all()
+    feed_state.save()
     
     return {
         "youtube": youtube_videos,
         "openai": openai_articles,
         "anthropic": anthropic_articles,
+        "feed_cache": feed_state.stats(),
     }
 
 
@@ -76,4 +130,4 @@ if __name__ == "__main__":
     print(f"YouTube videos: {len(results['youtube'])}")
     print(f"OpenAI articles: {len(results['openai'])}")
     print(f"Anthropic articles: {len(results['anthropic'])}")
-
+    print(f"Feed cache: {results['feed_cache']}")
@@ -1,8 +1,7 @@
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
-import feedparser
-from docling.document_converter import DocumentConverter
 from pydantic import BaseModel
+from .feed_state import FeedStateStore, parse_feed, entries_since_watermark, published_and_guid
 
 
 class AnthropicArticle(BaseModel):
@@ -14,50 +13,62 @@ class AnthropicArticle(BaseModel):
     category: Optional[str] = None
 
 
+def dedupe_articles(articles: List[AnthropicArticle]) -> List[AnthropicArticle]:
+    """Same article can appear in multiple feeds → keep the first copy of each guid."""
+    seen_guids = set()
+    unique = []
+    for article in articles:
+        if article.guid not in seen_guids:
+            seen_guids.add(article.guid)
+            unique.append(article)
+    return unique
+
+
 class AnthropicScraper:
-    def __init__(self):
+    def __init__(self, feed_state: Optional[FeedStateStore] = None):
+        self.feed_state = feed_state   # optional ETag/Last-Modified cache, unchanged feeds are skipped
         self.rss_urls = [  # Anthropic doesnt allow or show RSS feeds so using Olshansk method.
             "https://raw.githubusercontent.com/Olshansk/rss-feeds/main/feeds/feed_anthropic_news.xml",
             "https://raw.githubusercontent.com/Olshansk/rss-feeds/main/feeds/feed_anthropic_research.xml",
             "https://raw.githubusercontent.com/Olshansk/rss-feeds/main/feeds/feed_anthropic_engineering.xml",
         ]
-        self.converter = DocumentConverter()  # Library for converting web pages/PDFs to MARKDOWN.
+        self._converter = None  # built on first url_to_markdown(), scraping feeds never needs it.
+
+    @property
+    def converter(self):
+        if self._converter is None:
+            from docling.document_converter import DocumentConverter  # heavy import (torch, models), only paid when converting
+            self._converter = DocumentConverter()  # Library for converting web pages/PDFs to MARKDOWN.
+        return self._converter
 
     #==============================================================================
     # get the articles fmo various feeds
     #==============================================================================
-    def get_articles(self, hours: int = 24) -> List[AnthropicArticle]:
-        now = datetime.now(timezone.utc)
-        cutoff_time = now - timedelta(hours=hours)
-        articles = []
-        seen_guids = set()  # same article can appear in multiple feeds → need deduplication
-        
-        for rss_url in self.rss_urls:     # Parse through every 3 feeds. eg: (feed1= 2articles, feed2= 4articles,feed3= None)
-            feed = feedparser.parse(rss_url)
-            if not feed.entries:
-                continue
-            
-            for entry in feed.entries: # parse through each article in a feed.
-                published_parsed = getattr(entry, "published_parsed", None)
-                if not published_parsed:
-                    continue
-                
-                published_time = datetime(*published_parsed[:6], tzinfo=timezone.utc)
-                if published_time >= cutoff_time:
-                    guid = entry.get("id", entry.get("link", ""))
-                    if guid not in seen_guids:    #to check if the articles are already parsed by us.
-                        seen_guids.add(guid)
-                        articles.append(AnthropicArticle(
-                            title=entry.get("title", ""),
-                            description=entry.get("description", ""),
-                            url=entry.get("link", ""),
-                            guid=guid,
-                            published_at=published_time,
-                            category=entry.get("tags", [{}])[0].get("term") if entry.get("tags") else None
-                        ))
+    def get_articles_from(self, rss_url: str, hours: int = 24) -> List[AnthropicArticle]:
+        """One feed only, so the runners can download the three feeds in parallel."""
+        feed = parse_feed(rss_url, self.feed_state)
+        if feed is None or not feed.entries:   # None = 304 Not Modified
+            return []
         
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+        articles = []
+        # parse through each article in a feed, up to the feed's watermark (older ones were stored by an earlier run)
+        for entry, published_time, guid in entries_since_watermark(self.feed_state, rss_url, feed.entries, published_and_guid):
+            if published_time >= cutoff_time:
+                articles.append(AnthropicArticle(
+                    title=entry.get("title", ""),
+                    description=entry.get("description", ""),
+                    url=entry.get("link", ""),
+                    guid=guid,
+                    published_at=published_time,
+                    category=entry.get("tags", [{}])[0].get("term") if entry.get("tags") else None
+                ))
         return articles
 
+    def get_articles(self, hours: int = 24) -> List[AnthropicArticle]:
+        # Parse through every 3 feeds. eg: (feed1= 2articles, feed2= 4articles,feed3= None)
+        return dedupe_articles([a for rss_url in self.rss_urls for a in self.get_articles_from(rss_url, hours)])
+
     #==============================================================================
     # convert to MARKDOWN  (since we are using third-party feeds)
     #==============================================================================
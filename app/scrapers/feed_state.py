@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+import feedparser
+from app.metrics import METRICS
+
+
+FEED_STATE_PATH = os.getenv("FEED_STATE_PATH", ".feed_state.json")
+RECENT_PUBLISHED_KEEP = 20   # publish times remembered per feed (the daemon derives its poll rate from them)
+
+
+class FeedStateStore:
+    """
+    Remembers the ETag / Last-Modified of every feed URL between runs.
+
+    Process:
+        1. parse() sends the stored validators back (If-None-Match / If-Modified-Since)
+        2. Server answers 304 → nothing changed, return None without parsing (cache HIT)
+        3. Server answers 200 → parse as usual and stage the new validators (cache MISS)
+        4. commit(url) once that feed's rows are stored (discard(url) if storing failed),
+           save() writes the committed state to disk
+
+    Watermarks (incremental scraping):
+        Per feed, the newest (published_at, guid) already handed to the database. Scrapers walk
+        entries through entries_since_watermark() and stop at the first one at/behind it, so
+        steady-state runs send ~nothing to the bulk_create duplicate checks, whatever `hours` is.
+        Staged while scanning and applied by the same commit(url) as the validators, so a
+        failed DB write never hides the entries it was saving. To backfill further than the
+        watermark, delete the state file.
+
+    Thread-safe, so one store can be shared by the concurrent feed fetches in run_scrapers.
+    """
+
+    def __init__(self, path: str = FEED_STATE_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.entries_skipped = 0
+        self.state = {}
+        self.pending = {}   # {url: staged validators/watermark}, not used by parse()/watermark() until commit(url)
+        if self.path.exists():
+            try:
+                self.state = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                self.state = {}   # corrupt/unreadable file → start cold, it is only a cache
+
+    def parse(self, url: str) -> Optional[feedparser.FeedParserDict]:
+        with self.lock:
+            entry = dict(self.state.get(url, {}))
+
+        feed = feedparser.parse(url, etag=entry.get("etag"), modified=entry.get("modified"))
+
+        with self.lock:
+            if feed.get("status") == 304:
+                self.hits += 1
+                return None
+            self.misses += 1
+            if feed.get("status") == 200:   # only trust validators from a successful response
+                self.pending[url] = {"etag": feed.get("etag"), "modified": feed.get("modified")}
+        return feed
+
+    def watermark(self, url: str) -> Optional[Tuple[datetime, str]]:
+        with self.lock:
+            mark = self.state.get(url, {}).get("watermark")
+        if not mark:
+            return None
+        return datetime.fromisoformat(mark["published_at"]), mark["guid"]
+
+    def stage_watermark(self, url: str, newest: Optional[Tuple[datetime, str]], published: List[datetime],
+                        skipped: int) -> None:
+        with self.lock:
+            self.entries_skipped += skipped
+            staged = self.pending.setdefault(url, {})
+            staged["newest"] = newest
+            staged["published"] = published
+
+    def commit(self, url: str) -> None:
+        """The feed's rows are stored: its staged validators and watermark become the real ones."""
+        with self.lock:
+            staged = self.pending.pop(url, None)
+            if staged is None:
+                return
+            entry = self.state.setdefault(url, {})
+            if "etag" in staged:
+                entry["etag"] = staged["etag"]
+                entry["modified"] = staged["modified"]
+            if staged.get("published"):
+                recent = {datetime.fromisoformat(p) for p in entry.get("recent_published", [])} | set(staged["published"])
+                entry["recent_published"] = [p.isoformat() for p in sorted(recent)[-RECENT_PUBLISHED_KEEP:]]
+            newest = staged.get("newest")
+            mark = entry.get("watermark")
+            if newest and (mark is None or newest[0] > datetime.fromisoformat(mark["published_at"])):
+                entry["watermark"] = {"published_at": newest[0].isoformat(), "guid": newest[1]}
+
+    def commit_all(self) -> None:
+        with self.lock:
+            urls = list(self.pending)
+        for url in urls:
+            self.commit(url)
+
+    def discard(self, url: str) -> None:
+        """Storing the feed's rows failed: the next fetch sends the old validators and rescans from the old watermark."""
+        with self.lock:
+            self.pending.pop(url, None)
+
+    def recent_published(self, url: str) -> List[datetime]:
+        with self.lock:
+            return [datetime.fromisoformat(p) for p in self.state.get(url, {}).get("recent_published", [])]
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries_skipped": self.entries_skipped,
+            }
+
+    def save(self) -> None:
+        with self.lock:
+            payload = json.dumps(self.state, indent=2, sort_keys=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(payload)
+        os.replace(tmp_path, self.path)   # atomic swap, a crash never leaves half a file
+
+
+#===================================================================================
+# Scrapers call this: conditional GET when a store is given, plain cold parse otherwise.
+#===================================================================================
+def parse_feed(url: str, feed_state: Optional[FeedStateStore] = None) -> Optional[feedparser.FeedParserDict]:
+    with METRICS.timer("feed_fetch") as op:
+        feed = feedparser.parse(url) if feed_state is None else feed_state.parse(url)
+        if feed is None:
+            op["not_modified"] = 1
+        else:
+            op["entries"] = len(feed.entries)
+    return feed
+
+
+def published_and_guid(entry) -> Optional[Tuple[datetime, str]]:
+    """Default entry key for article feeds (OpenAI, Anthropic); entries without a date are ignored."""
+    published_parsed = getattr(entry, "published_parsed", None)
+    if not published_parsed:
+        return None
+    return datetime(*published_parsed[:6], tzinfo=timezone.utc), entry.get("id", entry.get("link", ""))
+
+
+#===================================================================================
+# Incremental scan: yields only entries newer than the feed's watermark, stages the new one.
+#===================================================================================
+def entries_since_watermark(feed_state: Optional[FeedStateStore], url: str, entries: list,
+                            key: Callable) -> Iterator[Tuple[object, datetime, str]]:
+    """
+    Args:
+        key: entry → (published_at, guid), or None to ignore the entry (no date, shorts, ...)
+    Yields:
+        (entry, published_at, guid) for unseen entries. Feeds list newest first, so the
+        scan stops at the first entry that is the watermark or older than it.
+    The newest entry yielded is only staged: the caller commits it with
+    feed_state.commit(url) after the rows are stored.
+    Without a store every entry is yielded (plain full scan).
+    """
+    watermark = feed_state.watermark(url) if feed_state else None
+    newest = None
+    published = []
+    skipped = 0
+    try:
+        for position, entry in enumerate(entries):
+            mark = key(entry)
+            if mark is None:
+                continue
+            published_at, guid = mark
+            if watermark and (guid == watermark[1] or published_at < watermark[0]):
+                skipped = len(entries) - position
+                break
+            published.append(published_at)
+            if newest is None or published_at > newest[0]:
+                newest = mark
+            yield entry, published_at, guid
+    finally:
+        METRICS.add("feed_scan", entries_new=len(published), entries_skipped=skipped)
+        if feed_state:
+            feed_state.stage_watermark(url, newest, published, skipped)
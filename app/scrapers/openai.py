@@ -1,8 +1,7 @@
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
-import feedparser
-from docling.document_converter import DocumentConverter
 from pydantic import BaseModel
+from .feed_state import FeedStateStore, parse_feed, entries_since_watermark, published_and_guid
 
 
 class OpenAIArticle(BaseModel):
@@ -15,34 +14,30 @@ class OpenAIArticle(BaseModel):
     
 
 class OpenAIScraper:
-    def __init__(self):
+    def __init__(self, feed_state: Optional[FeedStateStore] = None):
         self.rss_url = "https://openai.com/news/rss.xml"
-        self.converter = DocumentConverter() # its not being used, maybe mistake :\
+        self.feed_state = feed_state   # optional ETag/Last-Modified cache, unchanged feeds are skipped
 
     #=====================================================================
     #Fetch recent blog posts from OpenAI's RSS feed
     #=====================================================================
     def get_articles(self, hours: int = 24) -> List[OpenAIArticle]:
-        feed = feedparser.parse(self.rss_url)
-        if not feed.entries:
+        feed = parse_feed(self.rss_url, self.feed_state)
+        if feed is None or not feed.entries:   # None = 304 Not Modified
             return []
         
         now = datetime.now(timezone.utc)
         cutoff_time = now - timedelta(hours=hours)
         articles = []
         
-        for entry in feed.entries:
-            published_parsed = getattr(entry, "published_parsed", None)  # if "entries.published_parsed" present good, else None and escape the "for" loop.
-            if not published_parsed:
-                continue
-            
-            published_time = datetime(*published_parsed[:6], tzinfo=timezone.utc) # The * expands the tuple into separate arguments for the function eg: datetime(2025, 11, 29, 14, 30, 10,timezone=...).
+        # stops at the feed's watermark: articles an earlier run already stored are never re-checked
+        for entry, published_time, guid in entries_since_watermark(self.feed_state, self.rss_url, feed.entries, published_and_guid):
             if published_time >= cutoff_time:
                 articles.append(OpenAIArticle(
                     title=entry.get("title", ""),
                     description=entry.get("description", ""),
                     url=entry.get("link", ""),
-                    guid=entry.get("id", entry.get("link", "")),
+                    guid=guid,
                     published_at=published_time,
                     category=entry.get("tags", [{}])[0].get("term") if entry.get("tags") else None
                 ))
@@ -1,17 +1,27 @@
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 import os
-import feedparser
+import time
 from pydantic import BaseModel
 from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+from youtube_transcript_api._errors import CouldNotRetrieveTranscript, RequestBlocked, YouTubeRequestFailed
 from youtube_transcript_api.proxies import WebshareProxyConfig
+from .feed_state import FeedStateStore, parse_feed, entries_since_watermark
+from .proxy_pool import ProxyPool, PROXY_POOL_FILE
 
 
 class Transcript(BaseModel):
     text: str
 
 
+class TranscriptThrottled(Exception):
+    """YouTube is rate-limiting/blocking us: retry later, the video itself may be fine."""
+
+
+class TranscriptFetchFailed(Exception):
+    """Proxy/network failure (refused, timeout, 5xx): retry on another proxy, the video itself may be fine."""
+
+
 class ChannelVideo(BaseModel):
     title: str
     url: str
@@ -22,7 +32,10 @@ class ChannelVideo(BaseModel):
 
 
 class YouTubeScraper:
-    def __init__(self):
+    def __init__(self, feed_state: Optional[FeedStateStore] = None, proxy_pool: Optional[ProxyPool] = None):
+        self.feed_state = feed_state   # optional ETag/Last-Modified cache, unchanged feeds are skipped
+        # Several proxy identities (PROXY_POOL_FILE) take precedence over the single PROXY_USERNAME/PROXY_PASSWORD one.
+        self.proxy_pool = proxy_pool or (ProxyPool.from_file(PROXY_POOL_FILE) if PROXY_POOL_FILE else None)
         proxy_config = None
         proxy_username = os.getenv("PROXY_USERNAME")
         proxy_password = os.getenv("PROXY_PASSWORD")
@@ -56,33 +69,59 @@ class YouTubeScraper:
     #===================================================================================
     #gets transcript from video_id
     #===================================================================================
-    def get_transcript(self, video_id: str) -> Optional[Transcript]:
+    def get_transcript(self, video_id: str, raise_transient: bool = False) -> Optional[Transcript]:
+        """
+        Returns None only when the video really has no transcript (disabled, not found, unavailable).
+        Throttling and proxy/network failures also return None, unless raise_transient is set:
+        then they raise TranscriptThrottled / TranscriptFetchFailed so the caller can retry.
+        """
+        slot = self.proxy_pool.acquire() if self.proxy_pool else None
+        transcript_api = slot.api if slot else self.transcript_api
+        outcome = "failed"
+        started = time.monotonic()
         try:
-            transcript = self.transcript_api.fetch(video_id)   # returns YoutubeTranscriptApi object, that contains a list of snippets(dict) that contains {text,start,duration}.
+            transcript = transcript_api.fetch(video_id)   # returns YoutubeTranscriptApi object, that contains a list of snippets(dict) that contains {text,start,duration}.
             text = " ".join([snippet.text for snippet in transcript.snippets])  # you join all the "text" to form a transcript.
+            outcome = "success"
             return Transcript(text=text)   # pydantic model returned.
-        except (TranscriptsDisabled, NoTranscriptFound):  # handles the exception to avoid code crash.
+        except (RequestBlocked, YouTubeRequestFailed) as e:   # 429 / IP blocked / HTTP error = transient, not "no transcript"
+            throttled = isinstance(e, RequestBlocked) or "429" in e.reason
+            outcome = "throttled" if throttled else "failed"
+            if raise_transient:
+                raise (TranscriptThrottled if throttled else TranscriptFetchFailed)(video_id) from e
             return None
-        except Exception:
+        except CouldNotRetrieveTranscript:  # handles the exception to avoid code crash.
+            outcome = "success"   # the proxy worked, the video just has no transcript (disabled, not found, unavailable...)
             return None
+        except Exception as e:   # proxy refused/dead, timeout, connection reset: says nothing about the video
+            if raise_transient:
+                raise TranscriptFetchFailed(video_id) from e
+            return None
+        finally:
+            if slot:
+                self.proxy_pool.report(slot, outcome, time.monotonic() - started)
 
     #===================================================================================
     # Parses the Channel, for the latest(24hrs) Videos, returns ChannelVideo object
     #===================================================================================
+    def _entry_key(self, entry):
+        if "/shorts/" in entry.link:   #ignore the youtube Shorts
+            return None
+        published_time = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc) # This line converts the RSS timestamp (published_parsed) into a timezone-aware UTC datetime object..
+        return published_time, self._extract_video_id(entry.link)  #extract the video id from the link
+
     def get_latest_videos(self, channel_id: str, hours: int = 24) -> list[ChannelVideo]:
-        feed = feedparser.parse(self._get_rss_url(channel_id))  # uses FeedParser lib to parse through the RSS feed of the "CHANNEL_ID"
-        if not feed.entries:
+        rss_url = self._get_rss_url(channel_id)
+        feed = parse_feed(rss_url, self.feed_state)  # uses FeedParser lib to parse through the RSS feed of the "CHANNEL_ID"
+        if feed is None or not feed.entries:   # None = 304 Not Modified, nothing new since last run
             return []
         
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)  # only the last 24hrs.
         videos = []
         
-        for entry in feed.entries:
-            if "/shorts/" in entry.link:   #ignore the youtube Shorts
-                continue
-            published_time = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc) # This line converts the RSS timestamp (published_parsed) into a timezone-aware UTC datetime object..
+        # stops at the feed's watermark: videos an earlier run already stored are never re-checked
+        for entry, published_time, video_id in entries_since_watermark(self.feed_state, rss_url, feed.entries, self._entry_key):
             if published_time >= cutoff_time:
-                video_id = self._extract_video_id(entry.link)  #extract the video id from the link
                 videos.append(ChannelVideo(
                     title=entry.title,
                     url=entry.link,
@@ -5,6 +5,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
 import markdown
+from app.metrics import METRICS
 
 load_dotenv()
 
@@ -39,9 +40,13 @@ def send_email(subject: str, body_text: str, body_html: str = None, recipients:
         part2 = MIMEText(body_html, "html")
         msg.attach(part2)
     
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-        smtp.login(MY_EMAIL, APP_PASSWORD)
-        smtp.sendmail(MY_EMAIL, recipients, msg.as_string())
+    message = msg.as_string()
+    with METRICS.timer("smtp_send") as op:
+        op["bytes"] = len(message.encode("utf-8"))
+        op["recipients"] = len(recipients)
+        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
+            smtp.login(MY_EMAIL, APP_PASSWORD)
+            smtp.sendmail(MY_EMAIL, recipients, message)
 
 
 def markdown_to_html(markdown_text: str) -> str:
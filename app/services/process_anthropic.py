@@ -1,4 +1,7 @@
-from typing import Optional
+from typing import Optional, Tuple
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+import multiprocessing
 
 import sys
 from pathlib import Path
@@ -8,28 +11,103 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from app.scrapers.anthropic import AnthropicScraper
 from app.database.repository import Repository
+from app.metrics import METRICS
+from app.config import MARKDOWN_MAX_WORKERS, ENRICHMENT_COMMIT_INTERVAL
 
 
-def process_anthropic_markdown(limit: Optional[int] = None) -> dict:
-    scraper = AnthropicScraper()
+#===================================================================================
+# Worker side: one warm AnthropicScraper (and its DocumentConverter) per process.
+#===================================================================================
+_worker_scraper: Optional[AnthropicScraper] = None
+
+
+def _init_worker() -> None:
+    global _worker_scraper
+    _worker_scraper = AnthropicScraper()
+    _worker_scraper.converter   # build the DocumentConverter now, not on the first article
+
+
+def _convert_with(scraper: AnthropicScraper, guid: str, url: str) -> Tuple[str, Optional[str], float]:
+    # timed here, inside the worker: the parent's clock would include time queued behind other articles
+    started = time.perf_counter()
+    return guid, scraper.url_to_markdown(url), time.perf_counter() - started
+
+
+def _convert(guid: str, url: str) -> Tuple[str, Optional[str], float]:
+    return _convert_with(_worker_scraper, guid, url)
+
+
+def _completed(futures: dict):
+    """(guid, markdown, seconds) as conversions finish; a crashed worker (or BrokenProcessPool) is one failed article."""
+    for future in as_completed(futures):
+        try:
+            yield future.result()
+        except Exception as e:
+            print(f"Error converting article {futures[future]}: {e}")
+            yield futures[future], None, 0.0
+
+
+def process_anthropic_markdown(limit: Optional[int] = None, max_workers: int = MARKDOWN_MAX_WORKERS,
+                               commit_interval: int = ENRICHMENT_COMMIT_INTERVAL,
+                               executor: Optional[Executor] = None) -> dict:
+    """
+    executor: an already-warm pool of _init_worker processes (the daemon's MarkdownPool). It is
+    used as is and left running; without one, a pool is started here and shut down at the end.
+    """
     repo = Repository()
     
     articles = repo.get_anthropic_articles_without_markdown(limit=limit)
     processed = 0
     failed = 0
+    pending_updates = []   # (guid, markdown) written in one batch every commit_interval articles
     
-    for article in articles:
-        markdown = scraper.url_to_markdown(article.url)
+    def flush() -> None:
+        nonlocal processed, failed
         try:
+            repo.update_anthropic_articles_markdown(pending_updates)
+        except Exception as e:
+            repo.session.rollback()
+            processed -= len(pending_updates)
+            failed += len(pending_updates)
+            print(f"Error saving {len(pending_updates)} articles ({pending_updates[0][0]}, ...): {e}")
+        pending_updates.clear()
+    
+    owns_executor = False
+    if executor is not None:
+        futures = {executor.submit(_convert, article.guid, article.url): article.guid for article in articles}
+        results = _completed(futures)
+    elif max_workers <= 1 or len(articles) <= 1:
+        scraper = AnthropicScraper()
+        results = (_convert_with(scraper, article.guid, article.url) for article in articles)
+    else:
+        owns_executor = True
+        # spawn, not fork: Docling's torch/thread state must not be inherited from this process
+        executor = ProcessPoolExecutor(
+            max_workers=min(max_workers, len(articles)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        futures = {executor.submit(_convert, article.guid, article.url): article.guid for article in articles}
+        results = _completed(futures)   # stream back as each conversion finishes
+    
+    try:
+        for guid, markdown, seconds in results:
+            METRICS.record("docling_convert", seconds, error=not markdown,
+                           bytes=len(markdown.encode("utf-8")) if markdown else 0)
             if markdown:
-                repo.update_anthropic_article_markdown(article.guid, markdown)
+                pending_updates.append((guid, markdown))
                 processed += 1
             else:
                 failed += 1
-        except Exception as e:
-            failed += 1
-            print(f"Error processing article {article.guid}: {e}")
-            continue
+            
+            if len(pending_updates) >= commit_interval:
+                flush()
+        
+        if pending_updates:
+            flush()
+    finally:
+        if owns_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
     
     return {
         "total": len(articles),
@@ -43,4 +121,3 @@ if __name__ == "__main__":
     print(f"Total articles: {result['total']}")
     print(f"Processed: {result['processed']}")
     print(f"Failed: {result['failed']}")
-
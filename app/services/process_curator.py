@@ -37,9 +37,10 @@ def curate_digests(hours: int = 24) -> dict:
     
     if not ranked_articles:
         logger.error("Failed to rank digests")
-        return {"total": total, "ranked": 0}
+        return {"total": total, "ranked": 0, "prefilter_scores": curator.prefilter_scores}
     
-    logger.info(f"Successfully ranked {len(ranked_articles)} articles")
+    logger.info(f"Successfully ranked {len(ranked_articles)} articles "
+                f"({len(curator.prefilter_scores)} scored locally, top {curator.prefilter_top_k} sent to the LLM)")
     logger.info("\n=== Top 10 Ranked Articles ===")
     
     for article in ranked_articles[:10]:
@@ -61,7 +62,8 @@ def curate_digests(hours: int = 24) -> dict:
                 "reasoning": a.reasoning
             }
             for a in ranked_articles
-        ]
+        ],
+        "prefilter_scores": curator.prefilter_scores
     }
 
 
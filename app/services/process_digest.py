@@ -1,11 +1,15 @@
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+import os
+import socket
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from app.agent.digest_agent import DigestAgent
+from app.agent.digest_agent import DigestAgent, DigestOutput
+from app.config import DIGEST_MAX_WORKERS, DIGEST_QUEUE_BATCH_SIZE, DIGEST_QUEUE_LEASE_SECONDS, DIGEST_QUEUE_MAX_ATTEMPTS
 from app.database.repository import Repository
 
 logging.basicConfig(
@@ -16,8 +20,41 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def process_digests(limit: Optional[int] = None) -> dict:
-    agent = DigestAgent()
+#===================================================================================
+# Runs generate_digest on a pool and yields (article, digest or None, error or None) as each finishes.
+#===================================================================================
+def _generate_digests(agent: DigestAgent, articles: List[dict], max_workers: int) -> Iterator[Tuple[dict, Optional[DigestOutput], Optional[Exception]]]:
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="digest") as executor:
+        futures = {
+            executor.submit(
+                agent.generate_digest,
+                title=article["title"],
+                content=article["content"],
+                article_type=article["type"]
+            ): article
+            for article in articles
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+
+def _store_digest(repo: Repository, article: dict, digest_result: DigestOutput) -> None:
+    repo.create_digest(
+        article_type=article["type"],
+        article_id=article["id"],
+        url=article["url"],
+        title=digest_result.title,
+        summary=digest_result.summary,
+        published_at=article.get("published_at")
+    )
+
+
+def process_digests(limit: Optional[int] = None, max_workers: int = DIGEST_MAX_WORKERS,
+                    agent: Optional[DigestAgent] = None) -> dict:
+    agent = agent or DigestAgent()   # the daemon passes its warm agent
     repo = Repository()
     
     articles = repo.get_articles_without_digest(limit=limit)
@@ -25,31 +62,23 @@ def process_digests(limit: Optional[int] = None) -> dict:
     processed = 0
     failed = 0
     
-    logger.info(f"Starting digest processing for {total} articles")
+    logger.info(f"Starting digest processing for {total} articles ({max_workers} in flight)")
     
-    for idx, article in enumerate(articles, 1):
+    # LLM calls run on the pool; DB writes stay on this thread (the session is not thread-safe)
+    # and happen as each digest finishes, so a crash midway keeps everything already generated.
+    for idx, (article, digest_result, error) in enumerate(_generate_digests(agent, articles, max_workers), 1):
         article_type = article["type"]
         article_id = article["id"]
         article_title = article["title"][:60] + "..." if len(article["title"]) > 60 else article["title"]
         
-        logger.info(f"[{idx}/{total}] Processing {article_type}: {article_title} (ID: {article_id})")
+        logger.info(f"[{idx}/{total}] Finished {article_type}: {article_title} (ID: {article_id})")
         
         try:
-            digest_result = agent.generate_digest(
-                title=article["title"],
-                content=article["content"],
-                article_type=article_type
-            )
+            if error:
+                raise error
             
             if digest_result:
-                repo.create_digest(
-                    article_type=article_type,
-                    article_id=article_id,
-                    url=article["url"],
-                    title=digest_result.title,
-                    summary=digest_result.summary,
-                    published_at=article.get("published_at")
-                )
+                _store_digest(repo, article, digest_result)
                 processed += 1
                 logger.info(f"✓ Successfully created digest for {article_type} {article_id}")
             else:
@@ -64,13 +93,75 @@ def process_digests(limit: Optional[int] = None) -> dict:
     return {
         "total": total,
         "processed": processed,
-        "failed": failed
+        "failed": failed,
+        "cache": agent.cache.stats() if agent.cache else {}
+    }
+
+
+#===================================================================================
+# Queue worker: any number of these, on any number of hosts, drain digest_jobs together.
+#===================================================================================
+def process_digest_queue(worker_id: Optional[str] = None, batch_size: int = DIGEST_QUEUE_BATCH_SIZE,
+                         max_workers: int = DIGEST_MAX_WORKERS, lease_seconds: int = DIGEST_QUEUE_LEASE_SECONDS,
+                         max_attempts: int = DIGEST_QUEUE_MAX_ATTEMPTS) -> dict:
+    """
+    Process:
+        1. enqueue_digest_jobs() - idempotent, every worker may call it
+        2. claim a batch (FOR UPDATE SKIP LOCKED + lease), generate, ack/fail each job
+        3. repeat until nothing is left to claim
+    A worker that dies mid-batch only delays its jobs until their lease expires.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    agent = DigestAgent()
+    repo = Repository()
+    
+    queued = repo.enqueue_digest_jobs()
+    logger.info(f"Worker {worker_id}: {queued} new jobs queued")
+    
+    claimed = 0
+    processed = 0
+    failed = 0
+    while True:
+        articles = repo.claim_digest_jobs(worker_id, batch_size=batch_size, lease_seconds=lease_seconds, max_attempts=max_attempts)
+        if not articles:
+            break
+        claimed += len(articles)
+        
+        for article, digest_result, error in _generate_digests(agent, articles, max_workers):
+            try:
+                if error:
+                    raise error
+                if not digest_result:
+                    raise ValueError("digest generation returned nothing")
+                _store_digest(repo, article, digest_result)
+                if not repo.ack_digest_job(article["job_id"], worker_id):
+                    logger.warning(f"Lease on {article['job_id']} lost before ack; the digest is stored, the job stays with its new holder")
+                processed += 1
+                logger.info(f"✓ Successfully created digest for {article['type']} {article['id']}")
+            except Exception as e:
+                repo.session.rollback()
+                repo.fail_digest_job(article["job_id"], worker_id, str(e), max_attempts=max_attempts)
+                failed += 1
+                logger.error(f"✗ Error processing {article['type']} {article['id']}: {e}")
+    
+    logger.info(f"Worker {worker_id} done: {processed} processed, {failed} failed out of {claimed} claimed")
+    
+    return {
+        "worker_id": worker_id,
+        "queued": queued,
+        "claimed": claimed,
+        "processed": processed,
+        "failed": failed,
+        "cache": agent.cache.stats() if agent.cache else {}
     }
 
 
 if __name__ == "__main__":
-    result = process_digests()
-    print(f"Total articles: {result['total']}")
+    if "--queue" in sys.argv:
+        result = process_digest_queue()
+        print(f"Claimed: {result['claimed']}")
+    else:
+        result = process_digests()
+        print(f"Total articles: {result['total']}")
     print(f"Processed: {result['processed']}")
     print(f"Failed: {result['failed']}")
-
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,9 +18,10 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def generate_email_digest(hours: int = 24, top_n: int = 10) -> EmailDigestResponse:
-    curator = CuratorAgent(USER_PROFILE)
-    email_agent = EmailAgent(USER_PROFILE)
+def generate_email_digest(hours: int = 24, top_n: int = 10, curator: Optional[CuratorAgent] = None,
+                          email_agent: Optional[EmailAgent] = None) -> EmailDigestResponse:
+    curator = curator or CuratorAgent(USER_PROFILE)
+    email_agent = email_agent or EmailAgent(USER_PROFILE)
     repo = Repository()
     
     digests = repo.get_recent_digests(hours=hours)
@@ -66,9 +68,10 @@ def generate_email_digest(hours: int = 24, top_n: int = 10) -> EmailDigestRespon
     return email_digest
 
 
-def send_digest_email(hours: int = 24, top_n: int = 10) -> dict:
+def send_digest_email(hours: int = 24, top_n: int = 10, curator: Optional[CuratorAgent] = None,
+                      email_agent: Optional[EmailAgent] = None) -> dict:
     try:
-        result = generate_email_digest(hours=hours, top_n=top_n)
+        result = generate_email_digest(hours=hours, top_n=top_n, curator=curator, email_agent=email_agent)
         markdown_content = result.to_markdown()
         html_content = digest_to_html(result)
         
@@ -12,14 +12,21 @@ Why needed:
     Scraper saves videos fast (metadata only)
     This service fills in transcripts slowly (API calls)
 """
-from typing import Optional
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import random
 import sys
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from app.scrapers.youtube import YouTubeScraper
+from app.scrapers.youtube import YouTubeScraper, Transcript, TranscriptThrottled, TranscriptFetchFailed
+from app.scrapers.rate_limit import TokenBucket
 from app.database.repository import Repository
+from app.metrics import METRICS
+from app.config import (TRANSCRIPT_MAX_WORKERS, TRANSCRIPT_RATE_PER_SEC, TRANSCRIPT_BURST, TRANSCRIPT_MAX_RETRIES,
+                        ENRICHMENT_COMMIT_INTERVAL)
 
 # ============================================================================
 # SPECIAL MARKER - Prevent Re-checking Failed Videos
@@ -27,34 +34,105 @@ from app.database.repository import Repository
 TRANSCRIPT_UNAVAILABLE_MARKER = "__UNAVAILABLE__"
 
 
-def process_youtube_transcripts(limit: Optional[int] = None) -> dict:
-    scraper = YouTubeScraper()
+# ============================================================================
+# Worker: one video, rate-limited, retried with exponential backoff while throttled
+# ============================================================================
+def _fetch_transcript(scraper: YouTubeScraper, bucket: TokenBucket, video_id: str,
+                      max_retries: int) -> Tuple[str, Optional[Transcript]]:
+    """
+    Returns:
+        ("ok", Transcript)     transcript fetched
+        ("ok", None)           video has no transcript → mark unavailable
+        ("throttled", None)    still throttled after max_retries → leave NULL, retried next run
+        ("failed", None)       proxy/network errors on every attempt → leave NULL, retried next run
+    """
+    status = "throttled"
+    for attempt in range(max_retries + 1):
+        with METRICS.timer("transcript_rate_limit_wait"):
+            bucket.acquire()
+        try:
+            with METRICS.timer("transcript_fetch") as op:
+                transcript = scraper.get_transcript(video_id, raise_transient=True)
+                op["bytes"] = len(transcript.text.encode("utf-8")) if transcript else 0
+            return "ok", transcript
+        except TranscriptThrottled:
+            METRICS.add("transcript_fetch", throttled=1)
+            if attempt < max_retries:
+                METRICS.add("transcript_fetch", retries=1)
+                time.sleep(min(60.0, 2 ** attempt) * (1 + random.random()))   # 1-2s, 2-4s, 4-8s ... with jitter
+            status = "throttled"
+        except TranscriptFetchFailed:
+            # no backoff: the next attempt acquires another proxy slot (the failing one is benched after a few)
+            METRICS.add("transcript_fetch", proxy_failures=1)
+            if attempt < max_retries:
+                METRICS.add("transcript_fetch", retries=1)
+            status = "failed"
+    return status, None
+
+
+def process_youtube_transcripts(limit: Optional[int] = None, max_workers: int = TRANSCRIPT_MAX_WORKERS,
+                                rate_per_sec: float = TRANSCRIPT_RATE_PER_SEC, burst: int = TRANSCRIPT_BURST,
+                                max_retries: int = TRANSCRIPT_MAX_RETRIES,
+                                commit_interval: int = ENRICHMENT_COMMIT_INTERVAL,
+                                scraper: Optional[YouTubeScraper] = None) -> dict:
+    scraper = scraper or YouTubeScraper()
     repo = Repository()
+    bucket = TokenBucket(rate=rate_per_sec, capacity=burst)
     
     videos = repo.get_youtube_videos_without_transcript(limit=limit)
     processed = 0
     unavailable = 0
-    failed = 0
+    failed = 0   # throttled / proxy failures even after retries: left without transcript so the next run picks them up
+    pending_updates = []   # (video_id, transcript) written in one batch every commit_interval videos
     
-    for video in videos:
+    def flush() -> None:
+        nonlocal processed, unavailable, failed
         try:
-            transcript_result = scraper.get_transcript(video.video_id)
-            if transcript_result:
-                repo.update_youtube_video_transcript(video.video_id, transcript_result.text)
-                processed += 1
-            else:
-                repo.update_youtube_video_transcript(video.video_id, TRANSCRIPT_UNAVAILABLE_MARKER)
-                unavailable += 1
+            repo.update_youtube_video_transcripts(pending_updates)
         except Exception as e:
-            repo.update_youtube_video_transcript(video.video_id, TRANSCRIPT_UNAVAILABLE_MARKER)
-            unavailable += 1
-            print(f"Error processing video {video.video_id}: {e}")
+            repo.session.rollback()
+            marked = sum(1 for _, text in pending_updates if text == TRANSCRIPT_UNAVAILABLE_MARKER)
+            unavailable -= marked
+            processed -= len(pending_updates) - marked
+            failed += len(pending_updates)   # rows stay NULL, retried next run
+            print(f"Error saving {len(pending_updates)} transcripts ({pending_updates[0][0]}, ...): {e}")
+        pending_updates.clear()
+    
+    # Fetches run on the pool; DB writes stay on this thread as results arrive.
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="transcript") as executor:
+        futures = {
+            executor.submit(_fetch_transcript, scraper, bucket, video.video_id, max_retries): video.video_id
+            for video in videos
+        }
+        for future in as_completed(futures):
+            video_id = futures[future]
+            try:
+                status, transcript_result = future.result()
+                if status in ("throttled", "failed"):
+                    failed += 1
+                    print(f"{status.capitalize()} fetching video {video_id}, will retry next run")
+                elif transcript_result:
+                    pending_updates.append((video_id, transcript_result.text))
+                    processed += 1
+                else:
+                    pending_updates.append((video_id, TRANSCRIPT_UNAVAILABLE_MARKER))
+                    unavailable += 1
+            except Exception as e:
+                failed += 1   # unknown error says nothing about the video: leave NULL, retried next run
+                print(f"Error processing video {video_id}: {e}")
+            
+            if len(pending_updates) >= commit_interval:
+                flush()
+    
+    if pending_updates:
+        flush()
     
     return {
         "total": len(videos),
         "processed": processed,
         "unavailable": unavailable,
-        "failed": failed
+        "failed": failed,
+        "proxies": scraper.proxy_pool.stats() if scraper.proxy_pool else []
     }
 
 
@@ -0,0 +1,397 @@
+"""
+Streaming Pipeline - scrape → enrich → digest → persist, one item at a time
+
+Purpose:
+    The staged pipeline only starts summarizing once scraping and both enrichment
+    stages are completely done. Here every newly scraped item flows on immediately:
+
+        feeds ──► transcripts queue ──► transcript workers ──┐
+              ├─► markdown queue ────► Docling workers ─────┼──► digest queue ──► DigestAgent workers ──┐
+              └─► (OpenAI: nothing to enrich) ──────────────┘                                            │
+                                        enrichment results + digests ──► persist queue ──► one DB writer ◄┘
+
+    Every queue is bounded (STREAM_QUEUE_SIZE): a slow stage blocks the one feeding it,
+    so memory stays flat however much is scraped, and the first digest is stored
+    seconds after the first feed arrives.
+
+What it does NOT do:
+    Only items that are new in this run are streamed. Older backlog (throttled transcripts,
+    failed digests, ...) is left to the regular batch stages, which run_daily_pipeline
+    still runs after the stream in "stream" mode.
+
+Threads and the database:
+    Feeds are saved by the calling thread, everything else by the single persist thread,
+    each with its own Repository/session. Workers never touch the database.
+"""
+
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from typing import Callable, List, Optional, Tuple
+
+from .config import (YOUTUBE_CHANNELS, SCRAPER_MAX_WORKERS, SCRAPER_PER_HOST_LIMIT, STREAM_QUEUE_SIZE,
+                     TRANSCRIPT_MAX_WORKERS, TRANSCRIPT_RATE_PER_SEC, TRANSCRIPT_BURST, TRANSCRIPT_MAX_RETRIES,
+                     MARKDOWN_MAX_WORKERS, DIGEST_MAX_WORKERS, ENRICHMENT_COMMIT_INTERVAL)
+from .runner import _FeedFetcher, _video_rows, _article_rows
+from .scrapers.youtube import YouTubeScraper
+from .scrapers.openai import OpenAIScraper
+from .scrapers.anthropic import AnthropicScraper
+from .scrapers.feed_state import FeedStateStore
+from .scrapers.rate_limit import TokenBucket
+from .database.repository import Repository
+from .metrics import METRICS
+from .services.process_youtube import _fetch_transcript, TRANSCRIPT_UNAVAILABLE_MARKER
+from .services.process_anthropic import _init_worker, _convert, _convert_with
+from .services.process_digest import _store_digest
+from .agent.digest_agent import DigestAgent
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()   # end-of-stream marker, one per consumer thread
+
+
+def feed_sources(youtube_scraper: YouTubeScraper, openai_scraper: OpenAIScraper,
+                 anthropic_scraper: AnthropicScraper) -> List[Tuple[str, Optional[str], str, Callable[[int], list]]]:
+    """(source, channel_id, feed url, fetch(hours) -> items) for every configured feed."""
+    sources = [
+        ("youtube", channel_id, youtube_scraper._get_rss_url(channel_id),
+         functools.partial(youtube_scraper.get_latest_videos, channel_id))
+        for channel_id in YOUTUBE_CHANNELS
+    ]
+    sources.append(("openai", None, openai_scraper.rss_url, openai_scraper.get_articles))
+    sources.extend(
+        ("anthropic", None, rss_url, functools.partial(anthropic_scraper.get_articles_from, rss_url))
+        for rss_url in anthropic_scraper.rss_urls
+    )
+    return sources
+
+
+class MarkdownPool(Executor):
+    """
+    The Docling process pool, replaced by a fresh one once a worker crash (segfault, OOM kill)
+    has broken it. A BrokenProcessPool never recovers: without this, a long-lived owner like the
+    daemon would fail every later conversion until restarted. Conversions in flight at the
+    crash still fail (their rows stay NULL for the next sweep).
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.restarts = 0
+        self.pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: Docling's torch/thread state must not be inherited from this process
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker)
+
+    def _replace(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.pool is broken:   # the first thread to notice replaces it, the others reuse the new one
+                logger.warning("Docling pool broken by a worker crash, starting a new one")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._new_pool()
+                self.restarts += 1
+                METRICS.add("docling_convert", pool_restarts=1)
+            return self.pool
+
+    def submit(self, fn, /, *args, **kwargs):
+        pool = self.pool
+        try:
+            return pool.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            return self._replace(pool).submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self.pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def make_markdown_executor(markdown_workers: int) -> Optional[MarkdownPool]:
+    if markdown_workers <= 1:
+        return None   # markdown workers convert in-process
+    return MarkdownPool(markdown_workers)
+
+
+class StreamingPipeline:
+    """
+    The queues and worker threads. start() once, feed it with route() (or produce() for
+    one full scrape), stop() drains everything. run_streaming_pipeline does a single pass;
+    the daemon keeps one running for its whole life.
+    """
+
+    def __init__(self, queue_size: int, transcript_workers: int, markdown_workers: int, digest_workers: int,
+                 rate_per_sec: float, burst: int, max_retries: int, commit_interval: int):
+        self.transcript_queue = queue.Queue(maxsize=queue_size)
+        self.markdown_queue = queue.Queue(maxsize=queue_size)
+        self.digest_queue = queue.Queue(maxsize=queue_size)
+        self.persist_queue = queue.Queue(maxsize=queue_size)
+        self.queue_names = {
+            id(self.transcript_queue): "transcripts", id(self.markdown_queue): "markdown",
+            id(self.digest_queue): "digests", id(self.persist_queue): "persist",
+        }
+        self.transcript_workers = max(1, transcript_workers)
+        self.markdown_workers = max(1, markdown_workers)
+        self.digest_workers = max(1, digest_workers)
+        self.max_retries = max_retries
+        self.commit_interval = commit_interval
+        self.bucket = TokenBucket(rate=rate_per_sec, capacity=burst)
+
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.max_depth = {name: 0 for name in self.queue_names.values()}
+        self.started = time.perf_counter()
+        self.first_digest_seconds: Optional[float] = None
+
+    def count(self, key: str, n: int = 1) -> None:
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def put(self, q: queue.Queue, item) -> None:
+        q.put(item)   # blocks while the queue is full: this is the backpressure
+        depth = q.qsize()
+        with self.lock:
+            name = self.queue_names[id(q)]
+            self.max_depth[name] = max(self.max_depth[name], depth)
+
+    #===================================================================================
+    # Producer (calling thread): fetch feeds concurrently, save each as it arrives, forward new items.
+    #===================================================================================
+    def produce(self, youtube_scraper: YouTubeScraper, feed_state: FeedStateStore, hours: int,
+                max_workers: int, per_host_limit: int) -> None:
+        sources = feed_sources(youtube_scraper, OpenAIScraper(feed_state=feed_state), AnthropicScraper(feed_state=feed_state))
+        repo = Repository()
+
+        with _FeedFetcher(max_workers=max_workers, per_host_limit=per_host_limit) as fetcher:
+            futures = {
+                fetcher.submit(url, fetch, hours=hours): (source, channel_id, url)
+                for source, channel_id, url, fetch in sources
+            }
+            for future in as_completed(futures):
+                source, channel_id, url = futures[future]
+                try:
+                    self.route(repo, source, channel_id, future.result())
+                    feed_state.commit(url)   # rows are committed: now the feed may 304 / stop at its watermark
+                except Exception as e:
+                    repo.session.rollback()
+                    feed_state.discard(url)
+                    self.count("scrape_errors")
+                    logger.error(f"Error scraping {source} {channel_id or ''}: {e}")
+
+        feed_state.save()
+
+    def route(self, repo: Repository, source: str, channel_id: Optional[str], items: list) -> None:
+        self.count(f"scraped_{source}", len(items))
+        if source == "youtube":
+            new = set(repo.bulk_create_youtube_videos(_video_rows(channel_id, items), return_keys=True))
+        elif source == "openai":
+            new = set(repo.bulk_create_openai_articles(_article_rows(items), return_keys=True))
+        else:
+            new = set(repo.bulk_create_anthropic_articles(_article_rows(items), return_keys=True))
+        self.count(f"new_{source}", len(new))
+
+        for item in items:
+            item_id = item.video_id if source == "youtube" else item.guid
+            if item_id not in new:
+                continue
+            article = {
+                "type": source,
+                "id": item_id,
+                "title": item.title,
+                "url": item.url,
+                "content": item.transcript if source == "youtube" else item.description or "",
+                "published_at": item.published_at,
+            }
+            if source == "youtube" and not item.transcript:
+                self.put(self.transcript_queue, article)
+            elif source == "anthropic":
+                self.put(self.markdown_queue, article)
+            else:
+                self.put(self.digest_queue, article)
+
+    #===================================================================================
+    # Enrichment workers: same fetch/convert code as the batch services.
+    #===================================================================================
+    def transcript_worker(self, scraper: YouTubeScraper) -> None:
+        while (article := self.transcript_queue.get()) is not _DONE:
+            try:
+                status, transcript = _fetch_transcript(scraper, self.bucket, article["id"], self.max_retries)
+            except Exception as e:
+                logger.error(f"Error processing video {article['id']}: {e}")
+                status, transcript = "failed", None   # unknown error: leave NULL rather than mark unavailable
+            if status in ("throttled", "failed"):
+                self.count(f"transcripts_{status}")   # stays NULL, the batch stage retries it
+            elif transcript:
+                self.count("transcripts_processed")
+                self.put(self.persist_queue, ("transcript", article["id"], transcript.text))
+                self.put(self.digest_queue, {**article, "content": transcript.text})
+            else:
+                self.count("transcripts_unavailable")
+                self.put(self.persist_queue, ("transcript", article["id"], TRANSCRIPT_UNAVAILABLE_MARKER))
+
+    def markdown_worker(self, executor: Optional[Executor]) -> None:
+        scraper = AnthropicScraper() if executor is None else None
+        while (article := self.markdown_queue.get()) is not _DONE:
+            try:
+                if executor is None:
+                    _, markdown, seconds = _convert_with(scraper, article["id"], article["url"])
+                else:
+                    _, markdown, seconds = executor.submit(_convert, article["id"], article["url"]).result()
+                METRICS.record("docling_convert", seconds, error=not markdown,
+                               bytes=len(markdown.encode("utf-8")) if markdown else 0)
+            except Exception as e:
+                logger.error(f"Error converting {article['url']}: {e}")
+                markdown = None
+            if markdown:
+                self.count("markdown_processed")
+                self.put(self.persist_queue, ("markdown", article["id"], markdown))
+                self.put(self.digest_queue, {**article, "content": markdown})
+            else:
+                self.count("markdown_failed")
+
+    def digest_worker(self, agent) -> None:
+        while (article := self.digest_queue.get()) is not _DONE:
+            try:
+                digest = agent.generate_digest(title=article["title"], content=article["content"],
+                                               article_type=article["type"])
+            except Exception as e:
+                logger.error(f"Error generating digest for {article['type']} {article['id']}: {e}")
+                digest = None
+            if digest:
+                self.put(self.persist_queue, ("digest", article, digest))
+            else:
+                self.count("digests_failed")   # no digest row → process_digests picks it up later
+
+    #===================================================================================
+    # The only thread that writes enrichment results and digests.
+    #===================================================================================
+    def persist_worker(self) -> None:
+        repo = Repository()
+        transcripts, markdowns = [], []
+
+        def flush() -> None:
+            for pairs, write in ((transcripts, repo.update_youtube_video_transcripts),
+                                 (markdowns, repo.update_anthropic_articles_markdown)):
+                if not pairs:
+                    continue
+                try:
+                    write(pairs)
+                except Exception as e:
+                    repo.session.rollback()
+                    self.count("persist_errors", len(pairs))
+                    logger.error(f"Error saving {len(pairs)} enrichment results: {e}")
+                pairs.clear()
+
+        while (message := self.persist_queue.get()) is not _DONE:
+            kind = message[0]
+            if kind == "transcript":
+                transcripts.append(message[1:])
+            elif kind == "markdown":
+                markdowns.append(message[1:])
+            else:
+                _, article, digest = message
+                try:
+                    _store_digest(repo, article, digest)
+                    self.count("digests_processed")
+                    if self.first_digest_seconds is None:
+                        self.first_digest_seconds = time.perf_counter() - self.started
+                        logger.info(f"First digest stored after {self.first_digest_seconds:.1f}s")
+                except Exception as e:
+                    repo.session.rollback()
+                    self.count("persist_errors")
+                    logger.error(f"Error saving digest for {article['type']} {article['id']}: {e}")
+            if len(transcripts) + len(markdowns) >= self.commit_interval:
+                flush()
+        flush()
+
+
+    #===================================================================================
+    # Lifecycle
+    #===================================================================================
+    def start(self, youtube_scraper: YouTubeScraper, agent: DigestAgent, executor: Optional[Executor]) -> None:
+        self.persist_threads = _start(self.persist_worker, 1, "persist")
+        self.digest_threads = _start(self.digest_worker, self.digest_workers, "digest", agent)
+        self.transcript_threads = _start(self.transcript_worker, self.transcript_workers, "transcript", youtube_scraper)
+        self.markdown_threads = _start(self.markdown_worker, self.markdown_workers, "markdown", executor)
+
+    def stop(self) -> None:
+        # Drain front to back: each stage is closed only once everything feeding it has finished
+        _close(self.transcript_queue, self.transcript_threads)
+        _close(self.markdown_queue, self.markdown_threads)
+        _close(self.digest_queue, self.digest_threads)
+        _close(self.persist_queue, self.persist_threads)
+
+    def stats(self) -> dict:
+        with self.lock:
+            counts = dict(self.counts)
+            max_depth = dict(self.max_depth)
+        return {
+            "scraped": {s: counts.get(f"scraped_{s}", 0) for s in ("youtube", "openai", "anthropic")},
+            "new": {s: counts.get(f"new_{s}", 0) for s in ("youtube", "openai", "anthropic")},
+            "scrape_errors": counts.get("scrape_errors", 0),
+            "transcripts": {
+                "processed": counts.get("transcripts_processed", 0),
+                "unavailable": counts.get("transcripts_unavailable", 0),
+                "failed": counts.get("transcripts_throttled", 0) + counts.get("transcripts_failed", 0),
+            },
+            "markdown": {"processed": counts.get("markdown_processed", 0), "failed": counts.get("markdown_failed", 0)},
+            "digests": {"processed": counts.get("digests_processed", 0), "failed": counts.get("digests_failed", 0)},
+            "persist_errors": counts.get("persist_errors", 0),
+            "first_digest_seconds": self.first_digest_seconds,
+            "duration_seconds": time.perf_counter() - self.started,
+            "max_queue_depth": max_depth,
+        }
+
+
+def _start(target, count: int, name: str, *args) -> list:
+    threads = [threading.Thread(target=target, args=args, name=f"{name}-{i}", daemon=True) for i in range(count)]
+    for t in threads:
+        t.start()
+    return threads
+
+
+def _close(q: queue.Queue, threads: list) -> None:
+    for _ in threads:
+        q.put(_DONE)
+    for t in threads:
+        t.join()
+
+
+def run_streaming_pipeline(hours: int = 24, queue_size: int = STREAM_QUEUE_SIZE,
+                           max_workers: int = SCRAPER_MAX_WORKERS, per_host_limit: int = SCRAPER_PER_HOST_LIMIT,
+                           transcript_workers: int = TRANSCRIPT_MAX_WORKERS, markdown_workers: int = MARKDOWN_MAX_WORKERS,
+                           digest_workers: int = DIGEST_MAX_WORKERS, rate_per_sec: float = TRANSCRIPT_RATE_PER_SEC,
+                           burst: int = TRANSCRIPT_BURST, max_retries: int = TRANSCRIPT_MAX_RETRIES,
+                           commit_interval: int = ENRICHMENT_COMMIT_INTERVAL) -> dict:
+    pipeline = StreamingPipeline(queue_size, transcript_workers, markdown_workers, digest_workers,
+                                  rate_per_sec, burst, max_retries, commit_interval)
+    feed_state = FeedStateStore()
+    youtube_scraper = YouTubeScraper(feed_state=feed_state)   # also fetches the transcripts (proxy pool included)
+    agent = DigestAgent()
+    executor = make_markdown_executor(markdown_workers)
+
+    pipeline.start(youtube_scraper, agent, executor)
+    try:
+        pipeline.produce(youtube_scraper, feed_state, hours, max_workers, per_host_limit)
+    finally:
+        pipeline.stop()
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    return {
+        **pipeline.stats(),
+        "feed_cache": feed_state.stats(),
+        "cache": agent.cache.stats() if agent.cache else {},
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    result = run_streaming_pipeline(hours=24)
+    print(f"Scraped: {result['scraped']} (new: {result['new']})")
+    print(f"Digests: {result['digests']}")
+    print(f"First digest after: {result['first_digest_seconds']}")
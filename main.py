@@ -8,6 +8,11 @@ def main(hours: int = 24, top_n: int = 10):
 if __name__ == "__main__":
     import sys
     
+    if "--daemon" in sys.argv:   # resident mode: adaptive feed polling + daily email, until SIGTERM
+        from app.daemon import run_daemon
+        run_daemon()
+        exit(0)
+    
     hours = 24
     top_n = 10
     